@@ -0,0 +1,75 @@
+import os
+
+from manifest import hash_file, load_json, save_json
+from sync import list_files, sync_file
+
+ASSET_MANIFEST = "asset-manifest.json"
+FINGERPRINT_LENGTH = 12
+
+
+def load_hash_cache(cache_path):
+    cache = load_json(cache_path)
+    if not isinstance(cache, dict):
+        return {}
+    return cache
+
+def hash_assets(src, cache):
+    digests = {}
+    hashed = []
+    for path in list_files(src):
+        stat = os.stat(os.path.join(src, path))
+        entry = cache.get(path)
+        if entry is None or entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+            entry = [stat.st_size, stat.st_mtime_ns, hash_file(os.path.join(src, path))]
+            cache[path] = entry
+            hashed.append(path)
+        digests[path] = entry[2]
+    for path in set(cache) - set(digests):
+        del cache[path]
+    return digests, hashed
+
+def fingerprint_path(path, digest):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+def asset_url(path):
+    return "/" + path.replace(os.sep, "/")
+
+def load_asset_manifest(dst):
+    manifest = load_json(os.path.join(dst, ASSET_MANIFEST))
+    if not isinstance(manifest, dict):
+        return {}
+    return manifest
+
+def fingerprint_urls(src, cache_path=None):
+    if not os.path.exists(src):
+        raise Exception(f"Directory {src} does not exist.")
+    cache = load_hash_cache(cache_path)
+    digests, hashed = hash_assets(src, cache)
+    if cache_path is not None:
+        save_json(cache_path, cache, indent=2, sort_keys=True)
+    urls = {asset_url(path): asset_url(fingerprint_path(path, digest)) for path, digest in digests.items()}
+    return urls, digests, hashed
+
+def fingerprint_assets(src, dst, cache_path=None, link=False):
+    urls, digests, hashed = fingerprint_urls(src, cache_path)
+    written = []
+    for path, digest in digests.items():
+        fingerprinted = fingerprint_path(path, digest)
+        # The name changes whenever the content does, so an existing file
+        # is already current.
+        dst_path = os.path.join(dst, fingerprinted)
+        if not os.path.exists(dst_path):
+            sync_file(os.path.join(src, path), dst_path, link)
+            written.append(fingerprinted)
+
+    removed = []
+    current = set(urls.values())
+    for url in load_asset_manifest(dst).values():
+        dst_path = os.path.join(dst, url.lstrip("/"))
+        if url not in current and os.path.exists(dst_path):
+            os.remove(dst_path)
+            removed.append(url)
+
+    save_json(os.path.join(dst, ASSET_MANIFEST), urls, indent=2, sort_keys=True)
+    return urls, hashed, written, removed
@@ -0,0 +1,170 @@
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from blocktype import BlockType, parse_blocks, markdown_to_blocks, block_to_blocktype
+from common import text_to_textnodes, markdown_to_htmlnode, block_cache
+from template import CompiledTemplate
+from generate import generate_pages
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>"""
+
+
+def link_heavy_corpus(scale=1.0):
+    paragraphs = max(1, int(50 * scale))
+    links = max(1, int(200 * scale))
+    blocks = ["# Changelog"]
+    for p in range(paragraphs):
+        blocks.append(" ".join(f"Fixed [issue {p}-{i}](/issues/{p}/{i}) in **module {i}**," for i in range(links)))
+    return "\n\n".join(blocks)
+
+def long_list_corpus(scale=1.0):
+    items = max(1, int(5000 * scale))
+    lines = [f"- Item {i} with _emphasis_ and `code` and a [link](/items/{i})" for i in range(items)]
+    ordered = [f"{i + 1}. Step {i}" for i in range(items)]
+    return "# Reference\n\n" + "\n".join(lines) + "\n\n" + "\n".join(ordered)
+
+def code_block_corpus(scale=1.0):
+    lines = max(1, int(20000 * scale))
+    code = "\n".join(f"    value_{i} = compute(value_{i - 1}) ** 2  # _not_ **markdown**" for i in range(lines))
+    return f"# Listing\n\n```\n{code}\n```\n\nTrailing paragraph."
+
+def small_pages_corpus(scale=1.0):
+    pages = max(1, int(1000 * scale))
+    return [f"# Page {i}\n\nA short page with **bold** and a [link](/page/{i}).\n\n- one\n- two" for i in range(pages)]
+
+def time_stage(fn, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings), "repeat": repeat}
+
+def inline_texts(markdown):
+    texts = []
+    for block in parse_blocks(markdown):
+        if block.block_type is BlockType.UNORDERED_LIST or block.block_type is BlockType.ORDERED_LIST:
+            texts.extend(block.lines)
+        elif block.block_type is not BlockType.CODE:
+            texts.append(" ".join(block.lines))
+    return texts
+
+def bench_generate_pages(markdowns, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        template_path = os.path.join(tmp, "template.html")
+        with open(template_path, 'w') as f:
+            f.write(TEMPLATE)
+        pages = []
+        for i, markdown in enumerate(markdowns):
+            from_path = os.path.join(tmp, "content", str(i), "index.md")
+            os.makedirs(os.path.dirname(from_path), exist_ok=True)
+            with open(from_path, 'w') as f:
+                f.write(markdown)
+            pages.append((from_path, os.path.join(tmp, "docs", str(i), "index.html")))
+
+        def reset():
+            # Every run starts cold and writes every page, like a clean build.
+            block_cache.clear()
+            shutil.rmtree(os.path.join(tmp, "docs"), ignore_errors=True)
+
+        def generate_all():
+            # The same buffered PageWriter path a build takes; its progress
+            # lines would otherwise end up in the JSON report on stdout.
+            with redirect_stdout(io.StringIO()):
+                generate_pages(pages, template_path, "/")
+        return time_stage(generate_all, repeat, reset)
+
+def bench_markdown(markdown, repeat):
+    blocks = markdown_to_blocks(markdown)
+    texts = inline_texts(markdown)
+    node = markdown_to_htmlnode(markdown)
+    html = node.to_html()
+    template = CompiledTemplate(TEMPLATE)
+    return {
+        "markdown_to_blocks": time_stage(lambda: markdown_to_blocks(markdown), repeat),
+        "block_to_blocktype": time_stage(lambda: [block_to_blocktype(block) for block in blocks], repeat),
+        "text_to_textnodes": time_stage(lambda: [text_to_textnodes(text) for text in texts], repeat),
+        "markdown_to_htmlnode": time_stage(lambda: markdown_to_htmlnode(markdown), repeat),
+        "to_html": time_stage(node.to_html, repeat),
+        "template": time_stage(lambda: template.render_to_string({"Title": "Bench", "Content": html}), repeat),
+        "generate_page": bench_generate_pages([markdown], repeat),
+    }
+
+def bench_pages(markdowns, repeat):
+    return {
+        "markdown_to_htmlnode": time_stage(lambda: [markdown_to_htmlnode(markdown) for markdown in markdowns], repeat),
+        "generate_page": bench_generate_pages(markdowns, repeat),
+    }
+
+def run_benchmarks(scale=1.0, repeat=5, corpora=None):
+    suites = {
+        "link_heavy": lambda: bench_markdown(link_heavy_corpus(scale), repeat),
+        "long_lists": lambda: bench_markdown(long_list_corpus(scale), repeat),
+        "huge_code_block": lambda: bench_markdown(code_block_corpus(scale), repeat),
+        "small_pages": lambda: bench_pages(small_pages_corpus(scale), repeat),
+    }
+    results = {}
+    for name, suite in suites.items():
+        if corpora and name not in corpora:
+            continue
+        results[name] = suite()
+    return results
+
+def git_commit():
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the markdown to HTML pipeline.")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier applied to every corpus size")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage")
+    parser.add_argument("--corpus", action="append", help="only run the named corpus (repeatable)")
+    parser.add_argument("--output", help="write JSON results to this path instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "scale": args.scale,
+        },
+        "results": run_benchmarks(args.scale, args.repeat, args.corpus),
+    }
+    for corpus, stages in report["results"].items():
+        for stage, timing in stages.items():
+            print(f"{corpus:>16} {stage:<22} {timing['min'] * 1000:10.3f} ms", file=sys.stderr)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
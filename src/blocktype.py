@@ -1,3 +1,4 @@
+import re
 from enum import Enum
 
 
@@ -8,62 +9,118 @@ class BlockType(Enum):
     QUOTE = 4
     UNORDERED_LIST = 5
     ORDERED_LIST = 6
+    TABLE = 7
 
 
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+TABLE_DELIMITER_PATTERN = re.compile(r"^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$")
+
+# Block rules keyed on the first character of a block's first line, so
+# classifying a block only tries the rules that can possibly match it.
+BLOCK_RULES = {}
+
+
+class Block():
+    __slots__ = ("block_type", "lines")
+
+    def __init__(self, block_type, lines):
+        self.block_type = block_type
+        self.lines = lines
+
+    def __eq__(self, value):
+        return self.block_type == value.block_type and self.lines == value.lines
+
+    def __repr__(self):
+        return f"Block({self.block_type}, {self.lines})"
+
+def parse_blocks(markdown):
+    return list(iter_blocks(markdown.splitlines()))
+
+def iter_blocks(lines):
+    block_lines = []
+    fenced = False
+    for line in lines:
+        if fenced:
+            block_lines.append(line)
+            if line.rstrip().endswith("```"):
+                block_lines[-1] = line.rstrip()
+                yield Block(BlockType.CODE, block_lines)
+                block_lines = []
+                fenced = False
+            continue
+        if not line.strip():
+            if block_lines:
+                yield close_block(block_lines)
+                block_lines = []
+            continue
+        if not block_lines:
+            line = line.lstrip()
+            if line.startswith("```"):
+                stripped = line.rstrip()
+                if len(stripped) >= 6 and stripped.endswith("```"):
+                    yield Block(BlockType.CODE, [stripped])
+                else:
+                    block_lines.append(line)
+                    fenced = True
+                continue
+        block_lines.append(line)
+    if block_lines:
+        if fenced:
+            block_lines[-1] = block_lines[-1].rstrip()
+            yield Block(BlockType.CODE, block_lines)
+        else:
+            yield close_block(block_lines)
+
+def close_block(lines):
+    lines[-1] = lines[-1].rstrip()
+    return Block(lines_to_blocktype(lines), lines)
+
+def lines_to_blocktype(lines):
+    for block_type, matches in BLOCK_RULES.get(lines[0][:1], ()):
+        if matches(lines):
+            return block_type
+    return BlockType.PARAGRAPH
+
+def register_block_rule(leading_chars, block_type, matches):
+    for char in leading_chars:
+        BLOCK_RULES.setdefault(char, []).append((block_type, matches))
+
+def is_heading_block(lines):
+    return lines[0].startswith(HEADING_PREFIXES)
+
+def is_code_block(lines):
+    first = lines[0]
+    return first.startswith("```") and lines[-1].endswith("```") and (len(lines) > 1 or len(first) >= 6)
+
+def is_quote_block(lines):
+    return all(line.startswith(">") for line in lines)
+
+def is_unordered_list_block(lines):
+    return all(line.startswith("- ") for line in lines)
+
+def is_ordered_list_block(lines):
+    return all(line.startswith(f"{i + 1}. ") for i, line in enumerate(lines))
+
+def is_table_block(lines):
+    return (len(lines) >= 2 and all(line.startswith("|") for line in lines)
+            and TABLE_DELIMITER_PATTERN.match(lines[1].strip()) is not None)
+
 def markdown_to_blocks(markdown):
-    blocks = []
-    split_blocks = markdown.split("\n\n")
-    for block in split_blocks:
-        if block:
-            blocks.append(block.strip())
-    return blocks
+    return ["\n".join(block.lines) for block in parse_blocks(markdown)]
 
 def block_to_blocktype(markdown):
-    if is_heading_block(markdown):
-        return BlockType.HEADING
-    elif is_code_block(markdown):
-        return BlockType.CODE
-    elif is_quote_block(markdown):
-        return BlockType.QUOTE
-    elif is_unordered_list_block(markdown):
-        return BlockType.UNORDERED_LIST
-    elif is_ordered_list_block(markdown):
-        return BlockType.ORDERED_LIST
-    else:
-        return BlockType.PARAGRAPH
-
-def is_heading_block(markdown):
-    if markdown.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
-        return True
-    return False
-
-def is_code_block(markdown):
-    if markdown.startswith("```") and markdown.endswith("```"):
-        return True
-    return False
-
-def is_quote_block(markdown):
-    for split in markdown.splitlines():
-        if not split.startswith(">"):
-            return False
-    return True
-
-def is_unordered_list_block(markdown):
-    for split in markdown.splitlines():
-        if not split.startswith("- "):
-            return False
-    return True
-
-def is_ordered_list_block(markdown):
-    split_lines = markdown.splitlines()
-    for i in range(len(split_lines)):
-        if not split_lines[i].startswith(f"{i + 1}. "):
-            return False
-    return True
+    return lines_to_blocktype(markdown.splitlines() or [""])
 
 def get_header_number(text):
     counter = 0
-    for i in range(5):
-        if text[i] == "#":
-            counter += 1
-    return counter
\ No newline at end of file
+    while counter < 6 and counter < len(text) and text[counter] == "#":
+        counter += 1
+    return counter
+
+register_block_rule("#", BlockType.HEADING, is_heading_block)
+register_block_rule("`", BlockType.CODE, is_code_block)
+register_block_rule(">", BlockType.QUOTE, is_quote_block)
+register_block_rule("-", BlockType.UNORDERED_LIST, is_unordered_list_block)
+register_block_rule("1", BlockType.ORDERED_LIST, is_ordered_list_block)
+register_block_rule("|", BlockType.TABLE, is_table_block)
@@ -0,0 +1,349 @@
+import hashlib
+import os
+import time
+
+from assets import fingerprint_assets, fingerprint_urls
+from common import block_cache
+from highlight import highlight_cache
+from generate import copy_directory, collect_pages, generate_page, generate_page_recursive, page_dest_path, render_page
+from links import LinkGraph, output_targets
+from postprocess import minify, postprocess_directory
+from profiler import profile_stage
+from search import SearchIndex
+from shard import load_shards, merge_shards, write_shard_manifest
+from siteindex import generate_site_index, load_page_info_cache, save_page_info_cache, write_site_artifacts
+from sync import sync_directory
+from template import asset_version, set_asset_urls
+from watch import DependencyGraph, snapshot, diff_snapshots, start_server
+
+
+def default_cache_dir(content_dir, output_dir):
+    # Build state belongs to one output directory, so sites sharing a root
+    # (or an output parent) never prune or rebuild each other's files.
+    key = hashlib.sha256(output_dir.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(os.path.dirname(content_dir), ".cache", f"{os.path.basename(output_dir)}-{key}")
+
+class Site():
+    def __init__(self, content_dir, template_path, output_dir, static_dir=None, basepath="/", site_url=None, cache_dir=None):
+        self.content_dir = os.path.abspath(content_dir)
+        self.template_path = os.path.abspath(template_path)
+        self.output_dir = os.path.abspath(output_dir)
+        if static_dir is None:
+            static_dir = os.path.join(os.path.dirname(self.content_dir), "static")
+        self.static_dir = os.path.abspath(static_dir)
+        self.basepath = basepath or "/"
+        self.site_url = site_url
+        if cache_dir is None:
+            cache_dir = default_cache_dir(self.content_dir, self.output_dir)
+        self.cache_dir = os.path.abspath(cache_dir)
+
+    def __repr__(self):
+        return f"Site(Content:{self.content_dir}, Output:{self.output_dir}, Basepath:{self.basepath})"
+
+    @classmethod
+    def from_root(cls, root, basepath="/", site_url=None):
+        return cls(
+            os.path.join(root, "content"),
+            os.path.join(root, "template.html"),
+            os.path.join(root, "docs"),
+            os.path.join(root, "static"),
+            basepath,
+            site_url,
+        )
+
+class Builder():
+    def __init__(self, site, *, jobs=1, incremental=False, link_assets=False, block_cache_path=None, fingerprint=False, minify=False, compress=False,
+                 check_links=False, strict_links=False, search=False, search_shard_bytes=64 * 1024):
+        self.site = site
+        self.fingerprint = fingerprint
+        self.minify = minify
+        self.compress = compress
+        self.check_links = check_links or strict_links
+        self.strict_links = strict_links
+        self.link_graph = LinkGraph()
+        self.link_graph_loaded = False
+        self.search = search
+        self.search_index = SearchIndex(search_shard_bytes)
+        self.search_index_loaded = False
+        self.jobs = jobs
+        self.incremental = incremental
+        self.link_assets = link_assets
+        self.block_cache_path = block_cache_path
+        self.block_cache = block_cache
+        self.block_cache_loaded = False
+        self.highlight_cache_loaded = False
+        # The asset map is module state shared by every Builder in the
+        # process, so each Builder reinstalls its own before rendering.
+        self.asset_urls = {}
+        self.page_info_cache = {}
+        self.page_info_cache_loaded = False
+        self.index = []
+        self.graph = DependencyGraph()
+        self.sources = {}
+        self.builds = 0
+
+    def __repr__(self):
+        return f"Builder({self.site}, Builds:{self.builds}, Pages:{len(self.sources)})"
+
+    def build(self, profiler=None):
+        site = self.site
+        manifest_path = None
+        if self.incremental:
+            manifest_path = os.path.join(site.cache_dir, "manifest.json")
+        self.load_block_cache()
+        self.copy_static(profiler)
+        pages = generate_page_recursive(site.content_dir, site.template_path, site.output_dir, site.basepath,
+                                        manifest_path, self.jobs, profiler)
+        self.track_pages(pages)
+        with profile_stage(profiler, "site index"):
+            written = self.update_index()
+        print(f"Indexed {len(self.index)} page(s) and wrote {len(written)} generated file(s)")
+        self.finish(profiler)
+        self.save_block_cache()
+        self.builds += 1
+        return pages
+
+    def build_shard(self, shard, count, profiler=None):
+        site = self.site
+        manifest_path = None
+        if self.incremental:
+            manifest_path = os.path.join(site.cache_dir, f"manifest-{shard}-of-{count}.json")
+        self.load_block_cache()
+        # Pages must reference the same fingerprinted names as the merged
+        # site, but the assets themselves are only copied by the merge.
+        if self.fingerprint:
+            urls, _, _ = fingerprint_urls(site.static_dir, os.path.join(site.cache_dir, "asset-hashes.json"))
+            self.use_asset_urls(urls)
+        else:
+            self.use_asset_urls({})
+        pages = generate_page_recursive(site.content_dir, site.template_path, site.output_dir, site.basepath,
+                                        manifest_path, self.jobs, profiler, (shard, count))
+        with profile_stage(profiler, "shard manifest"):
+            write_shard_manifest(pages, site.content_dir, site.output_dir, shard, count)
+        print(f"Rendered {len(pages)} page(s) for shard {shard}/{count}")
+        self.save_block_cache()
+        self.builds += 1
+        return pages
+
+    def merge(self, shard_dirs, profiler=None):
+        site = self.site
+        expected = [os.path.relpath(dest_file_path, site.output_dir)
+                    for _, dest_file_path in collect_pages(site.content_dir, site.output_dir)]
+        # Every shard is verified before the output directory is touched, so
+        # a failed merge leaves the previous site in place.
+        with profile_stage(profiler, "shard verify"):
+            manifests, _ = load_shards(shard_dirs, expected)
+        self.copy_static(profiler)
+        with profile_stage(profiler, "merge"):
+            index = merge_shards(manifests, site.content_dir, site.output_dir)
+        print(f"Merged {len(index)} page(s) from {len(shard_dirs)} shard(s)")
+        pages = [(page.source, page.dest) for page in index]
+        self.track_pages(pages)
+        self.index = index
+        with profile_stage(profiler, "site index"):
+            written = write_site_artifacts(index, site.content_dir, site.template_path, site.output_dir,
+                                           site.basepath, site.site_url, self.generated_manifest_path())
+        print(f"Indexed {len(self.index)} page(s) and wrote {len(written)} generated file(s)")
+        self.finish(profiler)
+        self.builds += 1
+        return pages
+
+    def copy_static(self, profiler=None):
+        site = self.site
+        with profile_stage(profiler, "static copy"):
+            if self.incremental:
+                copied, removed = self.sync_static()
+                print(f"Synced {len(copied)} changed and removed {len(removed)} stale static file(s)")
+            else:
+                copy_directory(site.static_dir, site.output_dir)
+        if self.fingerprint:
+            with profile_stage(profiler, "fingerprint"):
+                self.fingerprint_assets()
+        else:
+            self.use_asset_urls({})
+
+    def use_asset_urls(self, urls):
+        self.asset_urls = urls
+        set_asset_urls(urls)
+
+    def sync_static(self):
+        site = self.site
+        # Minifying while copying keeps synced assets current; minifying them
+        # in place afterwards would make every sync copy them again.
+        return sync_directory(site.static_dir, site.output_dir, os.path.join(site.cache_dir, "assets.json"),
+                              self.link_assets, transform=minify if self.minify else None)
+
+    def finish(self, profiler=None):
+        with profile_stage(profiler, "search index"):
+            self.update_search_index()
+        with profile_stage(profiler, "link check"):
+            self.check_page_links()
+        with profile_stage(profiler, "postprocess"):
+            self.postprocess()
+
+    def load_block_cache(self):
+        if self.block_cache_path and not self.block_cache_loaded:
+            self.block_cache.load(self.block_cache_path)
+            self.block_cache_loaded = True
+        if not self.highlight_cache_loaded:
+            highlight_cache.load(os.path.join(self.site.cache_dir, "highlight.json"))
+            self.highlight_cache_loaded = True
+
+    def save_block_cache(self):
+        if self.block_cache.hits + self.block_cache.misses:
+            print(f"Block cache: {self.block_cache.hits} hits, {self.block_cache.misses} misses ({self.block_cache.hit_rate():.0%} hit rate)")
+        if self.block_cache_path:
+            self.block_cache.save(self.block_cache_path)
+        if len(highlight_cache):
+            highlight_cache.save(os.path.join(self.site.cache_dir, "highlight.json"))
+
+    def fingerprint_assets(self):
+        site = self.site
+        urls, hashed, written, removed = fingerprint_assets(site.static_dir, site.output_dir,
+                                                            os.path.join(site.cache_dir, "asset-hashes.json"),
+                                                            self.link_assets)
+        self.use_asset_urls(urls)
+        print(f"Fingerprinted {len(urls)} asset(s): hashed {len(hashed)}, wrote {len(written)}, removed {len(removed)}")
+
+    def update_search_index(self):
+        if not self.search:
+            return
+        site = self.site
+        index_path = os.path.join(site.cache_dir, "search.json")
+        if self.incremental and not self.search_index_loaded:
+            self.search_index.load(index_path)
+            self.search_index_loaded = True
+        pages = [(source, dest_file_path) for dest_file_path, source in self.sources.items()]
+        updated = self.search_index.update_pages(pages, site.output_dir)
+        written = self.search_index.write(site.output_dir)
+        if self.incremental:
+            self.search_index.save(index_path)
+        print(f"Search index: {len(updated)} page(s) updated, {len(written)} file(s) written, "
+              f"{len(self.search_index.shards)} shard(s)")
+
+    def check_page_links(self):
+        if not self.check_links:
+            return []
+        site = self.site
+        graph_path = os.path.join(site.cache_dir, "links.json")
+        if self.incremental and not self.link_graph_loaded:
+            self.link_graph.load(graph_path)
+            self.link_graph_loaded = True
+        pages = [(source, dest_file_path) for dest_file_path, source in self.sources.items()]
+        self.link_graph.update_pages(pages, site.output_dir)
+        checked = self.link_graph.check(output_targets(site.output_dir))
+        if self.incremental:
+            self.link_graph.save(graph_path)
+        broken = self.link_graph.broken_links()
+        for source, url in broken:
+            print(f"Broken link in {source}: {url}")
+        print(f"Checked links on {len(checked)} page(s); {len(broken)} broken link(s)")
+        if broken and self.strict_links:
+            raise Exception(f"Found {len(broken)} broken link(s)")
+        return broken
+
+    def postprocess(self):
+        if not self.minify and not self.compress:
+            return
+        site = self.site
+        processed, removed = postprocess_directory(site.output_dir, os.path.join(site.cache_dir, "postprocess.json"),
+                                                   self.minify, self.compress, self.jobs)
+        if self.compress:
+            print(f"Compressed {len(processed)} changed output(s) and removed {len(removed)} stale compressed file(s)")
+
+    def render(self, from_path):
+        set_asset_urls(self.asset_urls)
+        return render_page(from_path, self.site.template_path, self.site.basepath)
+
+    def track_pages(self, pages):
+        self.graph = DependencyGraph()
+        self.sources = {}
+        for file_path, dest_file_path in pages:
+            self.graph.add(dest_file_path, [file_path, self.site.template_path])
+            self.sources[dest_file_path] = file_path
+
+    def update_index(self):
+        site = self.site
+        info_cache_path = os.path.join(site.cache_dir, "page-info.json")
+        if self.incremental and not self.page_info_cache_loaded:
+            self.page_info_cache = load_page_info_cache(info_cache_path, site.content_dir, site.output_dir)
+            self.page_info_cache_loaded = True
+        pages = sorted((source, dest_file_path) for dest_file_path, source in self.sources.items())
+        self.index, written = generate_site_index(pages, site.content_dir, site.template_path, site.output_dir,
+                                                  site.basepath, site.site_url, self.page_info_cache,
+                                                  self.generated_manifest_path())
+        if self.incremental:
+            save_page_info_cache(info_cache_path, self.page_info_cache, site.content_dir, site.output_dir)
+        return written
+
+    def generated_manifest_path(self):
+        if not self.incremental:
+            return None
+        return os.path.join(self.site.cache_dir, "generated.json")
+
+    def rebuild(self, changed):
+        site = self.site
+        set_asset_urls(self.asset_urls)
+        assets_changed = False
+        if any(path.startswith(site.static_dir + os.sep) for path in changed):
+            self.sync_static()
+            if self.fingerprint:
+                version = asset_version()
+                self.fingerprint_assets()
+                assets_changed = asset_version() != version
+
+        for path in changed:
+            if not path.startswith(site.content_dir + os.sep) or not path.endswith(".md"):
+                continue
+            dest_file_path = page_dest_path(path, site.content_dir, site.output_dir)
+            if os.path.exists(path):
+                self.graph.add(dest_file_path, [path, site.template_path])
+                self.sources[dest_file_path] = path
+            elif dest_file_path in self.sources:
+                self.graph.remove(dest_file_path)
+                del self.sources[dest_file_path]
+                if os.path.exists(dest_file_path):
+                    os.remove(dest_file_path)
+                    dest_dir = os.path.dirname(dest_file_path)
+                    if not os.listdir(dest_dir):
+                        os.rmdir(dest_dir)
+                print(f"Removed page {dest_file_path}")
+
+        affected = self.graph.affected(changed)
+        if assets_changed:
+            affected = set(self.sources)
+        for dest_file_path in sorted(affected):
+            generate_page(self.sources[dest_file_path], site.template_path, dest_file_path, site.basepath)
+        if affected or any(path.endswith(".md") for path in changed):
+            self.update_index()
+        self.update_search_index()
+        self.check_page_links()
+        self.postprocess()
+        return affected
+
+    def watch(self, port, interval=0.5):
+        site = self.site
+        self.incremental = True
+        self.build()
+        watched = [site.content_dir, site.static_dir, site.template_path]
+        previous = snapshot(watched)
+        server = start_server(site.output_dir, port)
+        print(f"Serving {site.output_dir} at http://localhost:{port}/ (watching for changes, Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(interval)
+                current = snapshot(watched)
+                changed = diff_snapshots(previous, current)
+                if not changed:
+                    continue
+                previous = current
+                try:
+                    self.rebuild(changed)
+                except Exception as e:
+                    print(f"Rebuild failed: {e}")
+                    continue
+                server.build_version += 1
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+from manifest import load_json, save_json
+
+CACHE_VERSION = 4
+
+
+class BlockCache():
+    def __init__(self, max_entries=4096, max_bytes=32 * 1024 * 1024, version=CACHE_VERSION):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = version
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # Render workers record what they add so the parent process, which
+        # owns the on-disk cache, can merge it back.
+        self.new_entries = None
+
+    def __repr__(self):
+        return f"BlockCache(Entries:{len(self.entries)}, Bytes:{self.size}, Hits:{self.hits}, Misses:{self.misses})"
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        html = self.entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return html
+
+    def put(self, key, html):
+        if key in self.entries:
+            self.size -= entry_size(key, self.entries.pop(key))
+        self.entries[key] = html
+        self.size += entry_size(key, html)
+        if self.new_entries is not None:
+            self.new_entries[key] = html
+        while self.entries and (len(self.entries) > self.max_entries or self.size > self.max_bytes):
+            old_key, old_html = self.entries.popitem(last=False)
+            self.size -= entry_size(old_key, old_html)
+
+    def record_new(self):
+        self.new_entries = {}
+
+    def take_new(self):
+        if self.new_entries is None:
+            return [], 0, 0
+        entries = list(self.new_entries.items())
+        hits, misses = self.hits, self.misses
+        self.new_entries.clear()
+        self.hits = self.misses = 0
+        return entries, hits, misses
+
+    def merge(self, entries, hits, misses):
+        for key, html in entries:
+            self.put(key, html)
+        self.hits += hits
+        self.misses += misses
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+        }
+
+    def load(self, cache_path):
+        data = load_json(cache_path)
+        if not isinstance(data, dict) or data.get("version") != self.version:
+            return
+        for *key, html in data.get("entries", []):
+            self.put(tuple(key), html)
+
+    def save(self, cache_path):
+        save_json(cache_path, {
+            "version": self.version,
+            "entries": [[*key, html] for key, html in self.entries.items()],
+        })
+
+def entry_size(key, html):
+    return len(key[-1]) + len(html)
@@ -2,55 +2,96 @@ import re
 
 from textnode import TextNode, TextType
 from htmlnode import HTMLNode, LeafNode, ParentNode
-from blocktype import BlockType, markdown_to_blocks, block_to_blocktype, get_header_number
-
-def text_node_to_html_node(text_node):
-    match text_node.text_type:
-        case TextType.TEXT:
-            return LeafNode(None, text_node.text)
-        case TextType.BOLD:
-            return LeafNode("b", text_node.text)
-        case TextType.ITALIC:
-            return LeafNode("i", text_node.text)
-        case TextType.CODE:
-            return LeafNode("code", text_node.text)
-        case TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
-        case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
-        case _:
-            raise Exception("Not a recoginized text type")
+from blocktype import BlockType, markdown_to_blocks, block_to_blocktype, parse_blocks, iter_blocks, get_header_number, register_block_rule, HEADING_TAGS
+from template import asset_version, prefix_basepath
+from cache import BlockCache, CACHE_VERSION
+from highlight import HIGHLIGHTER_VERSION, highlight
+
+# Cached code blocks embed highlighter output, so they go stale with it.
+block_cache = BlockCache(version=f"{CACHE_VERSION}:{HIGHLIGHTER_VERSION}")
+
+IMAGE_PATTERN = re.compile(r"!\[(.*?)\]\((.*?)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[(.*?)\]\((.*?)\)")
+TABLE_CELL_PATTERN = re.compile(r"(?<!\\)\|")
+INLINE_MARKUP_PATTERN = re.compile(r"[*_`\[]")
+CODE_LANGUAGE_PATTERN = re.compile(r"```\s*([\w+#.-]+)")
+
+# Inline delimiters keyed on their first character, and block renderers keyed
+# on block type; register_inline and register_block extend both.
+INLINE_RULES = {}
+TEXT_TAGS = {TextType.TEXT: None}
+BLOCK_RENDERERS = {}
+
+def register_inline(delimiter, text_type, tag):
+    global INLINE_MARKUP_PATTERN
+    rules = INLINE_RULES.setdefault(delimiter[0], [])
+    rules.append((delimiter, len(delimiter), text_type))
+    rules.sort(key=lambda rule: len(rule[0]), reverse=True)
+    TEXT_TAGS[text_type] = tag
+    INLINE_MARKUP_PATTERN = re.compile(f"[{re.escape(''.join(INLINE_RULES))}\\[]")
+
+def register_block(block_type, render, leading_chars="", matches=None):
+    if matches is not None:
+        register_block_rule(leading_chars, block_type, matches)
+    BLOCK_RENDERERS[block_type] = render
+
+def text_node_to_html_node(text_node, basepath="/"):
+    if text_node.text_type is TextType.LINK:
+        return LeafNode("a", text_node.text, {"href": prefix_basepath(text_node.url, basepath)})
+    if text_node.text_type is TextType.IMAGE:
+        return LeafNode("img", "", {"src": prefix_basepath(text_node.url, basepath), "alt": text_node.text})
+    if text_node.text_type not in TEXT_TAGS:
+        raise Exception("Not a recoginized text type")
+    return LeafNode(TEXT_TAGS[text_node.text_type], text_node.text)
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
-    delimiters = ["**", "_", "`"]
     if not old_nodes:
         raise Exception("No nodes to split")
-    if delimiter not in delimiters:
+    if delimiter not in [rule[0] for rule in INLINE_RULES.get(delimiter[:1], ())]:
         raise Exception("Not valid markdown syntax")
     for node in old_nodes:
-        if node.text_type != TextType.TEXT:
+        if node.text_type != TextType.TEXT or delimiter not in node.text:
+            # Text without the delimiter (including empty text) passes
+            # through whole, so chained splits always have a node to split.
             new_nodes.append(node)
         else:
             split_text = node.text.split(delimiter)
             for i in range(len(split_text)):
                 if i % 2 != 0:
                     new_nodes.append(TextNode(split_text[i], text_type))
-                else:
+                elif split_text[i]:
                     new_nodes.append(TextNode(split_text[i], TextType.TEXT))
     return new_nodes
 
 def extract_markdown_images(text):
-    return re.findall(r"!\[(.*?)\]\((.*?)\)", text)
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
-    return re.findall(r"(?<!!)\[(.*?)\]\((.*?)\)", text)
+    return LINK_PATTERN.findall(text)
+
+def line_title(line):
+    # None when the line has no "#"; False when the first "#" of the page is
+    # not followed by a space, which means the page has no title.
+    position = line.find("#")
+    if position == -1:
+        return None
+    if line[position + 1:position + 2] != " ":
+        return False
+    return line[position + 2:].strip("# ")
 
 def extract_title(markdown):
-    title = re.findall(r"^[^#]*# (.*)", markdown)
-    if not title:
-        raise Exception("No title found in markdown")
-    return title[0].strip("# ")
+    return extract_title_from_lines(markdown.split("\n"))
+
+def extract_title_from_lines(lines):
+    for line in lines:
+        title = line_title(line)
+        if title is None:
+            continue
+        if title is False:
+            break
+        return title
+    raise Exception("No title found in markdown")
 
 def split_nodes_image(old_nodes):
     new_nodes = []
@@ -66,11 +107,12 @@ def split_nodes_image(old_nodes):
                 substring = f"![{image[0]}]({image[1]})"
                 start_index = text.find(substring)
                 end_index = start_index + len(substring)
-                new_nodes.append(TextNode(text[:start_index], TextType.TEXT))
+                if start_index > 0:
+                    new_nodes.append(TextNode(text[:start_index], TextType.TEXT))
                 new_nodes.append(TextNode(image[0], TextType.IMAGE, image[1]))
                 text = text[end_index:]
             if text:
-                new_nodes.append(TextNode(text[:end_index], TextType.TEXT))
+                new_nodes.append(TextNode(text, TextType.TEXT))
         else:
             new_nodes.append(node)
 
@@ -90,68 +132,218 @@ def split_nodes_link(old_nodes):
                 substring = f"[{link[0]}]({link[1]})"
                 start_index = text.find(substring)
                 end_index = start_index + len(substring)
-                new_nodes.append(TextNode(text[:start_index], TextType.TEXT))
+                if start_index > 0:
+                    new_nodes.append(TextNode(text[:start_index], TextType.TEXT))
                 new_nodes.append(TextNode(link[0], TextType.LINK, link[1]))
                 text = text[end_index:]
             if text:
-                new_nodes.append(TextNode(text[:end_index], TextType.TEXT))
+                new_nodes.append(TextNode(text, TextType.TEXT))
         else:
             new_nodes.append(node)
                
     return new_nodes
 
 def text_to_textnodes(text):
-    return split_nodes_image(split_nodes_link(
-        split_nodes_delimiter(
-            split_nodes_delimiter(
-                split_nodes_delimiter(
-                    [TextNode(text, TextType.TEXT)], "**", TextType.BOLD), "_", TextType.ITALIC), "`", TextType.CODE)))
-
-def markdown_to_htmlnode(markdown):
-    blocks = markdown_to_blocks(markdown)
-    child_nodes = []
+    if not INLINE_MARKUP_PATTERN.search(text):
+        return [TextNode(text, TextType.TEXT)] if text else []
+    nodes = []
+    found = {}
+
+    def find(token, start):
+        # Scan positions only move forward, so a cached hit past `start` or a
+        # cached miss is still valid and every token is scanned at most once.
+        position = found.get(token)
+        if position is None or (position != -1 and position < start):
+            position = text.find(token, start)
+            found[token] = position
+        return position
+
+    def flush(end):
+        if end > plain_start:
+            nodes.append(TextNode(text[plain_start:end], TextType.TEXT))
+
+    search = INLINE_MARKUP_PATTERN.search
+    plain_start = 0
+    position = 0
+    while True:
+        # Jump straight to the next character that can open markup.
+        match = search(text, position)
+        if match is None:
+            break
+        i = match.start()
+        node = None
+        end = -1
+        rules = INLINE_RULES.get(text[i])
+        if rules is not None:
+            for delimiter, delimiter_length, text_type in rules:
+                if not text.startswith(delimiter, i):
+                    continue
+                close = find(delimiter, i + delimiter_length)
+                if close != -1:
+                    node = TextNode(text[i + delimiter_length:close], text_type)
+                    end = close + delimiter_length
+                break
+        else:
+            close = find("](", i + 1)
+            if close != -1:
+                url_end = find(")", close + 2)
+                if url_end != -1:
+                    label_start = i + 1
+                    text_type = TextType.LINK
+                    if i > position and text[i - 1] == "!":
+                        text_type = TextType.IMAGE
+                        i -= 1
+                    node = TextNode(text[label_start:close], text_type, text[close + 2:url_end])
+                    end = url_end + 1
+        if node is None:
+            position = i + 1
+            continue
+        flush(i)
+        nodes.append(node)
+        position = plain_start = end
+    flush(len(text))
+    return nodes
+
+def markdown_to_htmlnode(markdown, basepath="/", cache=None):
+    return blocks_to_htmlnode(parse_blocks(markdown), basepath, cache)
+
+def blocks_to_htmlnode(blocks, basepath="/", cache=None):
+    return ParentNode("div", [render_block(block, basepath, cache) for block in blocks])
+
+def write_blocks_html(blocks, write, basepath="/", cache=None):
+    write("<div>")
     for block in blocks:
-        match block_to_blocktype(block):
-            case BlockType.PARAGRAPH:
-                child_nodes.append(ParentNode("p", text_to_children(block, BlockType.PARAGRAPH)))
-            case BlockType.HEADING:
-                header_number = f"h{get_header_number(block)}"
-                child_nodes.append(ParentNode(header_number, text_to_children(block, BlockType.HEADING)))
-            case BlockType.CODE:
-                joined_string = "".join(block.splitlines(True))
-                joined_string = ((joined_string.strip()).strip('```')).lstrip()
-                child_nodes.append(ParentNode("pre", [text_node_to_html_node(TextNode(joined_string, TextType.CODE))]))
-            case BlockType.QUOTE:
-                child_nodes.append(ParentNode("blockquote", text_to_children(block, BlockType.QUOTE)))
-            case BlockType.UNORDERED_LIST:
-                child_nodes.append(ParentNode("ul", list_to_html(block, BlockType.UNORDERED_LIST)))
-            case BlockType.ORDERED_LIST:
-                child_nodes.append(ParentNode("ol", list_to_html(block, BlockType.ORDERED_LIST)))
-    return ParentNode("div", child_nodes)
-
-def text_to_children(text, blocktype):
-    htmlnode_children = []
-    formatted_text = ""
+        render_block(block, basepath, cache).write_html(write)
+    write("</div>")
+
+def render_block(block, basepath="/", cache=None):
+    if cache is None:
+        return block_to_htmlnode(block, basepath)
+    # Extensions may register block types that are not BlockType members.
+    block_type = getattr(block.block_type, "name", str(block.block_type))
+    key = (block_type, basepath, asset_version(), "\n".join(block.lines))
+    html = cache.get(key)
+    if html is None:
+        html = block_to_htmlnode(block, basepath).to_html()
+        cache.put(key, html)
+    return LeafNode(None, html)
+
+def block_to_htmlnode(block, basepath="/"):
+    render = BLOCK_RENDERERS.get(block.block_type)
+    if render is None:
+        raise Exception("Not a recognized block type")
+    return render(block.lines, basepath)
+
+def paragraph_to_html(lines, basepath="/"):
+    return ParentNode("p", text_to_children(lines, BlockType.PARAGRAPH, basepath))
+
+def heading_to_html(lines, basepath="/"):
+    header_tag = HEADING_TAGS[get_header_number(lines[0]) - 1]
+    return ParentNode(header_tag, text_to_children(lines, BlockType.HEADING, basepath))
+
+def code_language(lines):
+    if len(lines) < 2:
+        return None
+    match = CODE_LANGUAGE_PATTERN.match(lines[0])
+    if match is None:
+        return None
+    return match.group(1)
+
+def code_to_html(lines, basepath="/"):
+    language = code_language(lines)
+    if language is None:
+        joined_string = ("\n".join(lines).strip('```')).lstrip()
+        return ParentNode("pre", [text_node_to_html_node(TextNode(joined_string, TextType.CODE))])
+    code = "\n".join(lines[1:])
+    if code.endswith("```"):
+        code = code[:-3]
+    highlighted = highlight(code, language)
+    if highlighted is None:
+        highlighted = code
+    return ParentNode("pre", [LeafNode("code", highlighted, {"class": f"language-{language}"})])
+
+def quote_to_html(lines, basepath="/"):
+    return ParentNode("blockquote", text_to_children(lines, BlockType.QUOTE, basepath))
+
+def unordered_list_to_html(lines, basepath="/"):
+    return ParentNode("ul", list_to_html(lines, BlockType.UNORDERED_LIST, basepath))
+
+def ordered_list_to_html(lines, basepath="/"):
+    return ParentNode("ol", list_to_html(lines, BlockType.ORDERED_LIST, basepath))
+
+def table_cells(line):
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in TABLE_CELL_PATTERN.split(line)]
+
+def table_alignment(cell):
+    if cell.startswith(":") and cell.endswith(":"):
+        return {"align": "center"}
+    if cell.endswith(":"):
+        return {"align": "right"}
+    if cell.startswith(":"):
+        return {"align": "left"}
+    return None
+
+def table_row(cells, tag, alignments, basepath):
+    children = []
+    for i, alignment in enumerate(alignments):
+        text = cells[i] if i < len(cells) else ""
+        nodes = [text_node_to_html_node(node, basepath) for node in text_to_textnodes(text)]
+        children.append(ParentNode(tag, nodes, alignment))
+    return ParentNode("tr", children)
+
+def table_to_html(lines, basepath="/"):
+    header = table_cells(lines[0])
+    alignments = [table_alignment(cell) for cell in table_cells(lines[1])]
+    alignments = (alignments + [None] * len(header))[:len(header)]
+    head = ParentNode("thead", [table_row(header, "th", alignments, basepath)])
+    rows = [table_row(table_cells(line), "td", alignments, basepath) for line in lines[2:]]
+    if not rows:
+        return ParentNode("table", [head])
+    return ParentNode("table", [head, ParentNode("tbody", rows)])
+
+def block_inline_text(lines, blocktype):
     if blocktype is BlockType.PARAGRAPH:
-        formatted_text = " ".join(text.splitlines())
+        return " ".join(lines)
     elif blocktype is BlockType.HEADING:
-        formatted_text = text.lstrip('# ')
+        return "\n".join(lines).lstrip('# ')
     elif blocktype is BlockType.QUOTE:
-        quote_block = text.splitlines()
-        quote_list = []
-        for quote in quote_block:
-            quote_list.append(quote.lstrip('> '))
-        formatted_text = " ".join(quote_list)
+        return " ".join([quote.lstrip('> ') for quote in lines])
     elif blocktype is BlockType.UNORDERED_LIST or blocktype is BlockType.ORDERED_LIST:
-        formatted_text = text.lstrip('1234567890.- ')
+        return lines[0].lstrip('1234567890.- ')
+    elif blocktype is BlockType.TABLE:
+        return " ".join(cell for i, line in enumerate(lines) if i != 1 for cell in table_cells(line))
+    return ""
 
+def text_to_children(lines, blocktype, basepath="/"):
+    htmlnode_children = []
+    formatted_text = block_inline_text(lines, blocktype)
+    if not INLINE_MARKUP_PATTERN.search(formatted_text):
+        return [LeafNode(None, formatted_text)] if formatted_text else []
     textnode_children = text_to_textnodes(formatted_text)
     for child in textnode_children:
-        htmlnode_children.append(text_node_to_html_node(child))
+        htmlnode_children.append(text_node_to_html_node(child, basepath))
     return htmlnode_children
 
-def list_to_html(markdown, list_type):
+def list_to_html(lines, list_type, basepath="/"):
     child_nodes = []
-    for split in markdown.splitlines():
-        child_nodes.append(ParentNode("li", text_to_children(split, list_type)))
+    for line in lines:
+        child_nodes.append(ParentNode("li", text_to_children([line], list_type, basepath)))
     return child_nodes
+
+register_inline("`", TextType.CODE, "code")
+register_inline("**", TextType.BOLD, "b")
+register_inline("_", TextType.ITALIC, "i")
+register_inline("~~", TextType.STRIKETHROUGH, "del")
+
+register_block(BlockType.PARAGRAPH, paragraph_to_html)
+register_block(BlockType.HEADING, heading_to_html)
+register_block(BlockType.CODE, code_to_html)
+register_block(BlockType.QUOTE, quote_to_html)
+register_block(BlockType.UNORDERED_LIST, unordered_list_to_html)
+register_block(BlockType.ORDERED_LIST, ordered_list_to_html)
+register_block(BlockType.TABLE, table_to_html)
@@ -0,0 +1,58 @@
+import itertools
+
+FRONT_MATTER_FENCE = "---"
+
+
+def split_front_matter(markdown):
+    if not markdown.startswith(FRONT_MATTER_FENCE):
+        return {}, markdown
+    metadata, lines = read_front_matter(markdown.split("\n"))
+    return metadata, "\n".join(lines)
+
+def read_front_matter(lines):
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    # The opening fence must start the file; only trailing whitespace is allowed.
+    if first.rstrip() != FRONT_MATTER_FENCE:
+        return {}, itertools.chain([first], lines)
+    front_matter = []
+    for line in lines:
+        if line.strip() in (FRONT_MATTER_FENCE, "..."):
+            return parse_front_matter(front_matter), lines
+        front_matter.append(line)
+    return {}, itertools.chain([first], front_matter)
+
+def parse_front_matter(lines):
+    metadata = {}
+    key = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and key is not None:
+            if metadata[key] is None:
+                metadata[key] = []
+            if not isinstance(metadata[key], list):
+                raise Exception(f"Front matter key {key} mixes a value and list items")
+            metadata[key].append(parse_front_matter_value(stripped[2:].strip()))
+            continue
+        if ":" not in line:
+            raise Exception(f"Invalid front matter line: {line}")
+        key, value = line.split(":", 1)
+        key = key.strip()
+        value = value.strip()
+        metadata[key] = parse_front_matter_value(value) if value else None
+    return metadata
+
+def parse_front_matter_value(value):
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_front_matter_value(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value == "true":
+        return True
+    if value == "false":
+        return False
+    return value
@@ -0,0 +1,202 @@
+import concurrent.futures
+import os
+import shutil
+from common import *
+from template import asset_urls, asset_version, load_template, set_asset_urls
+from profiler import BuildProfiler, profile_stage
+from writer import PageWriter, write_if_changed
+from frontmatter import split_front_matter, read_front_matter
+from manifest import hash_file, load_manifest, save_manifest, manifest_entry, is_page_current, remove_stale_outputs
+from shard import partition_pages
+from highlight import highlight_cache
+
+STREAM_THRESHOLD = 16 * 1024 * 1024
+
+def copy_directory(src, dst, clean=True):
+    if not os.path.exists(src):
+        raise Exception(f"Directory {src} does not exist.")
+    if clean and os.path.exists(dst):
+        shutil.rmtree(dst)
+    os.makedirs(dst, exist_ok=True)
+    if os.path.exists(src):
+        for fname in os.listdir(src):
+            src_path = os.path.join(src, fname)
+            dst_path = os.path.join(dst, fname)
+            if os.path.isdir(src_path):
+                copy_directory(src_path, dst_path, clean)
+            else:
+                shutil.copy(src_path, dst_path)
+
+def parse_page(from_path, template_path, basepath, profiler=None):
+    if not os.path.exists(from_path) or not os.path.isfile(from_path):
+        raise Exception(f"Source file {from_path} does not exist.")
+    template = load_template(template_path, basepath)
+
+    with profile_stage(profiler, "read", from_path):
+        with open(from_path, 'r') as f:
+            metadata, content = split_front_matter(f.read())
+
+    with profile_stage(profiler, "block parse", from_path):
+        blocks = parse_blocks(content)
+    with profile_stage(profiler, "inline parse", from_path):
+        page_node = blocks_to_htmlnode(blocks, basepath, block_cache)
+    slots = page_slots(metadata)
+    if not metadata.get("title"):
+        slots["Title"] = extract_title(content)
+    return template, slots, page_node
+
+def page_slots(metadata):
+    slots = {}
+    for key, value in metadata.items():
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        slots[key] = value
+        slots[key[:1].upper() + key[1:]] = value
+    return slots
+
+def read_source_lines(source_file):
+    return read_front_matter(line.rstrip("\r\n") for line in source_file)
+
+def stream_page(from_path, template_path, dest_path, basepath):
+    if not os.path.exists(from_path) or not os.path.isfile(from_path):
+        raise Exception(f"Source file {from_path} does not exist.")
+    template = load_template(template_path, basepath)
+    dest_dir = os.path.dirname(dest_path)
+    if not os.path.exists(dest_dir):
+        os.makedirs(dest_dir, exist_ok=True)
+
+    # The source is read line by line and each block is rendered and written
+    # as soon as it is parsed, so memory stays bounded by the largest block.
+    with open(from_path, 'r') as source_file:
+        metadata, lines = read_source_lines(source_file)
+        slots = page_slots(metadata)
+        if not metadata.get("title"):
+            with open(from_path, 'r') as title_file:
+                slots["Title"] = extract_title_from_lines(read_source_lines(title_file)[1])
+        slots["Content"] = lambda write: write_blocks_html(iter_blocks(lines), write, basepath)
+        tmp_path = f"{dest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            template.render(f.write, slots)
+    os.replace(tmp_path, dest_path)
+
+def is_large_page(from_path):
+    return os.path.getsize(from_path) >= STREAM_THRESHOLD
+
+def render_page(from_path, template_path, basepath, profiler=None):
+    template, slots, page_node = parse_page(from_path, template_path, basepath, profiler)
+    with profile_stage(profiler, "serialize", from_path):
+        slots["Content"] = page_node.to_html()
+    with profile_stage(profiler, "template", from_path):
+        return template.render_to_string(slots).encode("utf-8")
+
+def init_render_worker(urls):
+    set_asset_urls(urls)
+    block_cache.record_new()
+    highlight_cache.record_new()
+
+def render_page_job(from_path, template_path, dest_path, basepath, profiler=None):
+    if profiler is None and is_large_page(from_path):
+        stream_page(from_path, template_path, dest_path, basepath)
+        return None, profiler, block_cache.take_new(), highlight_cache.take_new()
+    data = render_page(from_path, template_path, basepath, profiler)
+    return data, profiler, block_cache.take_new(), highlight_cache.take_new()
+
+def generate_page(from_path, template_path, dest_path, basepath, log=True, profiler=None, writer=None):
+    if log:
+        print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+
+    if profiler is None and (writer is None or is_large_page(from_path)):
+        stream_page(from_path, template_path, dest_path, basepath)
+        return
+
+    # Buffered pages are handed to the writer as bytes; profiled builds also
+    # take this path so serialization, templating and writing are timed apart.
+    data = render_page(from_path, template_path, basepath, profiler)
+    with profile_stage(profiler, "write", from_path):
+        if writer is not None:
+            writer.submit(dest_path, data)
+        else:
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            write_if_changed(dest_path, data)
+
+def generate_pages(pages, template_path, basepath, jobs=1, profiler=None, write_threads=4):
+    if jobs <= 1 or len(pages) <= 1:
+        with PageWriter(write_threads) as writer:
+            for file_path, dest_file_path in pages:
+                generate_page(file_path, template_path, dest_file_path, basepath, True, profiler, writer)
+    else:
+        writer = render_pages_parallel(pages, template_path, basepath, jobs, profiler, write_threads)
+    if writer.skipped:
+        print(f"Left {writer.skipped} page(s) with unchanged output untouched")
+
+def render_pages_parallel(pages, template_path, basepath, jobs, profiler, write_threads=4):
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=init_render_worker,
+                                                initargs=(dict(asset_urls),)) as executor:
+        futures = [executor.submit(render_page_job, file_path, template_path, dest_file_path, basepath,
+                                   None if profiler is None else BuildProfiler())
+                   for file_path, dest_file_path in pages]
+        # The first submit forks every worker, so the writer's threads only
+        # start once no more forks will happen.
+        with PageWriter(write_threads) as writer:
+            for (file_path, dest_file_path), future in zip(pages, futures):
+                try:
+                    data, worker_profiler, blocks, highlights = future.result()
+                except Exception as e:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    raise Exception(f"Failed to generate page from {file_path}: {e}") from e
+                print(f"Generating page from {file_path} to {dest_file_path} using {template_path}")
+                if profiler is not None:
+                    profiler.merge(worker_profiler)
+                block_cache.merge(*blocks)
+                highlight_cache.merge(*highlights)
+                if data is not None:
+                    with profile_stage(profiler, "write", file_path):
+                        writer.submit(dest_file_path, data)
+    return writer
+
+def collect_pages(from_dir_path, dest_dir_path):
+    if not os.path.exists(from_dir_path) or not os.path.isdir(from_dir_path):
+        raise Exception(f"Source directory {from_dir_path} does not exist.")
+    pages = []
+    for file in sorted(os.listdir(from_dir_path)):
+        file_path = os.path.join(from_dir_path, file)
+        if os.path.isdir(file_path):
+            new_dest_dir = os.path.join(dest_dir_path, file)
+            pages.extend(collect_pages(file_path, new_dest_dir))
+        elif file.endswith(".md"):
+            dest_file_path = os.path.join(dest_dir_path, file.replace(".md", ".html"))
+            pages.append((file_path, dest_file_path))
+    return pages
+
+def generate_page_recursive(from_dir_path, template_path, dest_dir_path, basepath, manifest_path=None, jobs=1, profiler=None, shard=None):
+    if not os.path.exists(from_dir_path) or not os.path.isdir(from_dir_path):
+        raise Exception(f"Source directory {from_dir_path} does not exist.")
+    if not os.path.exists(template_path) or not os.path.isfile(template_path):
+        raise Exception(f"Template file {template_path} does not exist.")
+
+    pages = collect_pages(from_dir_path, dest_dir_path)
+    if shard is not None:
+        pages = partition_pages(pages, from_dir_path, *shard)
+    if manifest_path is None:
+        generate_pages(pages, template_path, basepath, jobs, profiler)
+        return pages
+
+    old_manifest = load_manifest(manifest_path)
+    new_manifest = {"pages": {}}
+    template_hash = hash_file(template_path)
+    changed_pages = []
+    for file_path, dest_file_path in pages:
+        entry = manifest_entry(file_path, hash_file(file_path), template_hash, basepath, asset_version())
+        if not is_page_current(old_manifest, dest_file_path, entry):
+            changed_pages.append((file_path, dest_file_path))
+        new_manifest["pages"][dest_file_path] = entry
+    generate_pages(changed_pages, template_path, basepath, jobs, profiler)
+    for removed in remove_stale_outputs(old_manifest, new_manifest):
+        print(f"Removed stale page {removed}")
+    save_manifest(manifest_path, new_manifest)
+    print(f"Skipped {len(pages) - len(changed_pages)} unchanged page(s)")
+    return pages
+
+def page_dest_path(file_path, from_dir_path, dest_dir_path):
+    relative_path = os.path.relpath(file_path, from_dir_path)
+    return os.path.join(dest_dir_path, relative_path.replace(".md", ".html"))
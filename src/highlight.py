@@ -0,0 +1,171 @@
+import builtins
+import hashlib
+import html
+import keyword
+import re
+
+from cache import BlockCache
+
+try:
+    import pygments
+    from pygments import highlight as pygments_highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+except ImportError:
+    pygments = None
+
+# Bump when the built-in tokenizer's output changes; cached highlights from
+# other tokenizer or Pygments versions are never reused.
+TOKENIZER_VERSION = 1
+HIGHLIGHTER_VERSION = f"{TOKENIZER_VERSION}+pygments-{pygments.__version__}" if pygments else str(TOKENIZER_VERSION)
+
+LANGUAGE_ALIASES = {
+    "py": "python", "python3": "python", "py3": "python",
+    "js": "javascript", "jsx": "javascript", "mjs": "javascript", "node": "javascript",
+    "ts": "typescript", "tsx": "typescript",
+    "sh": "bash", "shell": "bash", "zsh": "bash",
+    "yml": "yaml",
+    "h": "c",
+    "c++": "cpp", "cc": "cpp", "cxx": "cpp", "hpp": "cpp",
+    "golang": "go",
+    "rs": "rust",
+}
+
+C_LIKE_KEYWORDS = ("break case const continue default do else for goto if return sizeof static struct switch "
+                   "typedef union void while")
+JAVASCRIPT_KEYWORDS = ("async await break case catch class const continue debugger default delete do else export "
+                       "extends finally for from function if import in instanceof let new of return static super "
+                       "switch this throw try typeof var void while with yield")
+
+# Each language is (keywords, constants, builtins, line comment, block comment,
+# string quotes, case sensitive).
+LANGUAGES = {
+    "python": (
+        keyword.kwlist + keyword.softkwlist, "True False None",
+        [name for name in dir(builtins) if not name.startswith("_")],
+        "#", None, ('"""', "'''", '"', "'"), True,
+    ),
+    "javascript": (JAVASCRIPT_KEYWORDS, "true false null undefined NaN Infinity",
+                   "Array Boolean console Date Error JSON Map Math Number Object Promise RegExp Set String Symbol window document",
+                   "//", ("/*", "*/"), ('"', "'", "`"), True),
+    "typescript": (JAVASCRIPT_KEYWORDS + " abstract as declare enum implements interface keyof namespace private "
+                   "protected public readonly type", "true false null undefined NaN Infinity",
+                   "any boolean never number object string unknown void Array Map Promise Record Set console",
+                   "//", ("/*", "*/"), ('"', "'", "`"), True),
+    "json": ("", "true false null", "", None, None, ('"',), True),
+    "bash": ("case do done elif else esac export fi for function if in local readonly return select then until while",
+             "", "alias cd echo eval exec exit printf pwd read set shift source test trap unset",
+             "#", None, ('"', "'"), True),
+    "css": ("", "", "", None, ("/*", "*/"), ('"', "'"), True),
+    "c": (C_LIKE_KEYWORDS + " auto char double enum extern float inline int long register restrict short signed "
+          "unsigned volatile", "NULL true false", "printf malloc free sizeof",
+          "//", ("/*", "*/"), ('"', "'"), True),
+    "cpp": (C_LIKE_KEYWORDS + " auto bool catch char class constexpr delete double enum explicit extern float "
+            "friend inline int long namespace new noexcept operator private protected public short signed "
+            "template this throw try typename unsigned using virtual", "nullptr true false NULL",
+            "std cout cin endl string vector map", "//", ("/*", "*/"), ('"', "'"), True),
+    "java": ("abstract assert break case catch class continue default do else enum extends final finally for if "
+             "implements import instanceof interface new package private protected public return static super "
+             "switch synchronized this throw throws try void volatile while boolean byte char double float int "
+             "long short var", "true false null", "String System Object Integer List Map",
+             "//", ("/*", "*/"), ('"', "'"), True),
+    "go": ("break case chan const continue default defer else fallthrough for func go goto if import interface map "
+           "package range return select struct switch type var", "true false nil iota",
+           "append cap close copy delete len make new panic print println recover string int error bool byte",
+           "//", ("/*", "*/"), ('"', "'", "`"), True),
+    "rust": ("as async await break const continue crate dyn else enum extern fn for if impl in let loop match mod "
+             "move mut pub ref return self Self static struct super trait type unsafe use where while",
+             "true false None Some Ok Err", "Box Option Result String Vec println format vec",
+             "//", ("/*", "*/"), ('"',), True),
+    "sql": ("add all alter and as asc between by case create delete desc distinct drop else end exists from group "
+            "having in index inner insert into is join key left like limit not on or order outer primary "
+            "references right select set table then union unique update values view when where with",
+            "null true false", "avg count max min sum", "--", ("/*", "*/"), ("'", '"'), False),
+    "yaml": ("", "true false null yes no on off", "", "#", None, ('"', "'"), True),
+}
+
+NUMBER_PATTERN = r"\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+NAME_PATTERN = r"[A-Za-z_$][\w$]*"
+
+highlight_cache = BlockCache(max_entries=8192)
+lexers = {}
+
+
+def word_set(words, case_sensitive):
+    if isinstance(words, str):
+        words = words.split()
+    return {word if case_sensitive else word.lower() for word in words}
+
+def string_pattern(quote):
+    if len(quote) == 3:
+        return re.escape(quote) + r"[\s\S]*?" + re.escape(quote)
+    q = re.escape(quote)
+    return f"{q}(?:\\\\.|[^{q}\\\\\\n])*{q}"
+
+def build_lexer(language):
+    keywords, constants, names, line_comment, block_comment, quotes, case_sensitive = LANGUAGES[language]
+    parts = []
+    if block_comment:
+        parts.append(f"(?P<c>{re.escape(block_comment[0])}[\\s\\S]*?(?:{re.escape(block_comment[1])}|\\Z))")
+    if line_comment:
+        parts.append(f"(?P<c1>{re.escape(line_comment)}[^\\n]*)")
+    parts.append(f"(?P<s>{'|'.join(string_pattern(quote) for quote in quotes)})")
+    parts.append(f"(?P<m>{NUMBER_PATTERN})")
+    parts.append(f"(?P<n>{NAME_PATTERN})")
+    pattern = re.compile("|".join(parts))
+    words = {}
+    for css_class, group in (("nb", names), ("kc", constants), ("k", keywords)):
+        for word in word_set(group, case_sensitive):
+            words[word] = css_class
+    return pattern, words, case_sensitive
+
+def canonical_language(language):
+    language = language.lower()
+    return LANGUAGE_ALIASES.get(language, language)
+
+def tokenize_code(code, language):
+    lexer = lexers.get(language)
+    if lexer is None:
+        lexer = lexers[language] = build_lexer(language)
+    pattern, words, case_sensitive = lexer
+    chunks = []
+    position = 0
+    for match in pattern.finditer(code):
+        css_class = match.lastgroup
+        text = match.group()
+        if css_class == "n":
+            css_class = words.get(text if case_sensitive else text.lower())
+            if css_class is None:
+                continue
+        if match.start() > position:
+            chunks.append(html.escape(code[position:match.start()], quote=False))
+        chunks.append(f'<span class="{css_class}">{html.escape(text, quote=False)}</span>')
+        position = match.end()
+    chunks.append(html.escape(code[position:], quote=False))
+    return "".join(chunks)
+
+def highlight_code(code, language):
+    if pygments is not None:
+        try:
+            lexer = get_lexer_by_name(language)
+        except ClassNotFound:
+            lexer = None
+        if lexer is not None:
+            # Pygments always ends its output with a newline.
+            highlighted = pygments_highlight(code, lexer, HtmlFormatter(nowrap=True))
+            return highlighted if code.endswith("\n") else highlighted[:-1]
+    if language in LANGUAGES:
+        return tokenize_code(code, language)
+    return None
+
+def highlight(code, language):
+    language = canonical_language(language)
+    key = (language, hashlib.sha256(code.encode("utf-8")).hexdigest(), HIGHLIGHTER_VERSION)
+    highlighted = highlight_cache.get(key)
+    if highlighted is None:
+        highlighted = highlight_code(code, language)
+        if highlighted is None:
+            return None
+        highlight_cache.put(key, highlighted)
+    return highlighted
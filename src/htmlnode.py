@@ -1,6 +1,8 @@
 
 
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -11,6 +13,11 @@ class HTMLNode():
         return f"HTMLNode(Tag:{self.tag}, Value:{self.value}, Children:{self.children}, Props:{self.props})"
     
     def to_html(self):
+        chunks = []
+        self.write_html(chunks.append)
+        return "".join(chunks)
+
+    def write_html(self, write):
         raise NotImplementedError()
     
     def props_to_html(self):
@@ -23,27 +30,32 @@ class HTMLNode():
         return "".join(prop_list)
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag=tag, value=value, children=None, props=props)
     
-    def to_html(self):
+    def write_html(self, write):
         if self.value == None:
             raise ValueError()
         if self.tag == None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            write(self.value)
+            return
+        write(f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>")
     
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def write_html(self, write):
         if self.tag == None:
             raise ValueError("No tag found")
         if self.children == None:
             raise ValueError("No children found")
-        base = ""
+        write(f"<{self.tag}{self.props_to_html()}>")
         for child in self.children:
-            base += child.to_html()
-        return f"<{self.tag}>{base}</{self.tag}>"
+            child.write_html(write)
+        write(f"</{self.tag}>")
         
\ No newline at end of file
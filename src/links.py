@@ -0,0 +1,134 @@
+import os
+import posixpath
+import re
+from urllib.parse import unquote, urlsplit
+
+from frontmatter import split_front_matter
+from manifest import load_json, save_json
+from search import page_text_nodes
+from siteindex import page_url
+from sync import list_files
+from textnode import TextType
+
+LINKS_VERSION = 2
+LINK_TYPES = (TextType.LINK, TextType.IMAGE)
+# Root-relative paths without any of these can skip urlsplit and normpath.
+PATH_SPECIAL_PATTERN = re.compile(r"[?#%\\]|//|/\.")
+
+
+def extract_page_links(markdown):
+    if "](" not in markdown:
+        return []
+    # The same nodes the renderer builds, so text in code is never a link.
+    return [node.url for node in page_text_nodes(markdown) if node.text_type in LINK_TYPES]
+
+def strip_index(path):
+    if path == "index.html":
+        return ""
+    if path.endswith("/index.html"):
+        return path[:-len("/index.html")]
+    return path
+
+def target_key(url, page_dir):
+    if url.startswith("/") and not PATH_SPECIAL_PATTERN.search(url):
+        return strip_index(url.strip("/"))
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    if not path.startswith("/"):
+        path = posixpath.join(page_dir, path)
+    path = posixpath.normpath(path).lstrip("/")
+    if path == ".":
+        path = ""
+    return strip_index(path)
+
+def output_targets(output_dir):
+    return {strip_index(path.replace(os.sep, "/")) for path in list_files(output_dir)}
+
+class LinkGraph():
+    def __init__(self):
+        self.pages = {}
+        self.linked_from = {}
+        self.targets = set()
+        self.broken = {}
+        self.dirty = set()
+
+    def __repr__(self):
+        return f"LinkGraph(Pages:{len(self.pages)}, Targets:{len(self.targets)}, Broken:{len(self.broken)})"
+
+    def set_links(self, source, stamp, links):
+        self.remove_page(source)
+        self.pages[source] = (stamp, links)
+        for _, key in links:
+            self.linked_from.setdefault(key, set()).add(source)
+        self.dirty.add(source)
+
+    def remove_page(self, source):
+        _, links = self.pages.pop(source, (None, ()))
+        for _, key in links:
+            sources = self.linked_from.get(key)
+            if sources is not None:
+                sources.discard(source)
+                if not sources:
+                    del self.linked_from[key]
+        self.broken.pop(source, None)
+        self.dirty.discard(source)
+
+    def update_pages(self, pages, output_dir):
+        current = set()
+        for source, dest_path in pages:
+            current.add(source)
+            stat = os.stat(source)
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            entry = self.pages.get(source)
+            if entry is not None and entry[0] == stamp:
+                continue
+            with open(source, 'r') as f:
+                _, body = split_front_matter(f.read())
+            page_dir = page_url(dest_path, output_dir)
+            if not page_dir.endswith("/"):
+                page_dir = posixpath.dirname(page_dir)
+            links = []
+            for url in extract_page_links(body):
+                key = target_key(url, page_dir)
+                if key is not None:
+                    links.append((url, key))
+            self.set_links(source, stamp, links)
+        for source in set(self.pages) - current:
+            self.remove_page(source)
+
+    def check(self, targets):
+        recheck = set(self.dirty)
+        for key in targets ^ self.targets:
+            recheck.update(self.linked_from.get(key, ()))
+        for source in recheck:
+            broken = [url for url, key in self.pages[source][1] if key not in targets]
+            if broken:
+                self.broken[source] = broken
+            else:
+                self.broken.pop(source, None)
+        self.targets = targets
+        self.dirty.clear()
+        return recheck
+
+    def broken_links(self):
+        return [(source, url) for source in sorted(self.broken) for url in self.broken[source]]
+
+    def load(self, graph_path):
+        data = load_json(graph_path)
+        if not isinstance(data, dict) or data.get("version") != LINKS_VERSION:
+            return
+        for source, (stamp, links) in data["pages"].items():
+            self.set_links(source, stamp, [tuple(link) for link in links])
+        self.targets = set(data["targets"])
+        self.broken = data["broken"]
+        self.dirty.clear()
+
+    def save(self, graph_path):
+        save_json(graph_path, {
+            "version": LINKS_VERSION,
+            "pages": self.pages,
+            "targets": sorted(self.targets),
+            "broken": self.broken,
+        })
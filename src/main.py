@@ -1,79 +1,128 @@
+import argparse
+import cProfile
 import os
-import shutil
 import sys
-from common import *
+from builder import Site, Builder
+from shard import parse_shard
+from preview import serve_preview
+from profiler import BuildProfiler
 
-def copy_directory(src, dst):
-    if not os.path.exists(src):
-        raise Exception(f"Directory {src} does not exist.")
-    if os.path.exists(dst):
-        shutil.rmtree(dst)
-    os.mkdir(dst)
-    if os.path.exists(src):
-        for fname in os.listdir(src):
-            src_path = os.path.join(src, fname)
-            dst_path = os.path.join(dst, fname)
-            if os.path.isdir(src_path):
-                copy_directory(src_path, dst_path)
-            else:
-                shutil.copy(src_path, dst_path)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    if not os.path.exists(from_path) or not os.path.isfile(from_path):
-        raise Exception(f"Source file {from_path} does not exist.")
-    if not os.path.exists(template_path) or not os.path.isfile(template_path):
-        raise Exception(f"Template file {template_path} does not exist.")
-    dest_dir = os.path.dirname(dest_path)
-    if not os.path.exists(dest_dir):
-        os.makedirs(dest_dir, exist_ok=True)
-    
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    
-    with open(from_path, 'r') as f:
-        content = f.read()
-    
-    with open(template_path, 'r') as f:
-        template = f.read()
-    
-    page_content = markdown_to_htmlnode(content).to_html()
-    full_page = template.replace("{{ Content }}", page_content).replace("{{ Title }}", extract_title(content))
-    full_page = full_page.replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
-    full_page = full_page.replace('href=/', f'href={basepath}').replace('src=/', f'src={basepath}')
-    
-    with open(dest_path, 'w') as f:
-        f.write(full_page)
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate the static site from markdown content.")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--content", default=os.path.join(ROOT, "content"),
+                        help="directory containing the markdown sources")
+    parser.add_argument("--static", default=os.path.join(ROOT, "static"),
+                        help="directory of static files copied into the output")
+    parser.add_argument("--template", default=os.path.join(ROOT, "template.html"),
+                        help="HTML template used for every page")
+    parser.add_argument("--output",
+                        help="directory the site is generated into (docs/, or shards/K-of-N/ with --shard)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only re-render pages whose source or template changed")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes used to render pages")
+    parser.add_argument("--block-cache", metavar="PATH",
+                        help="persist rendered blocks to PATH between builds")
+    parser.add_argument("--link-assets", action="store_true",
+                        help="hardlink static files into the output when syncing incrementally")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="copy static files under content-hashed names and rewrite references to them")
+    parser.add_argument("--minify", action="store_true",
+                        help="collapse whitespace in generated HTML (outside <pre>) and CSS")
+    parser.add_argument("--compress", action="store_true",
+                        help="write precompressed .gz (and .br, if brotli is installed) siblings of text outputs")
+    parser.add_argument("--check-links", action="store_true",
+                        help="report links and images in content that point at missing pages or files")
+    parser.add_argument("--strict-links", action="store_true",
+                        help="like --check-links, but fail the build when a link is broken")
+    parser.add_argument("--search", action="store_true",
+                        help="write a prefix-sharded full-text search index to search/ in the output")
+    parser.add_argument("--search-shard-kb", type=int, default=64, metavar="KB",
+                        help="approximate size at which a search index shard is split")
+    parser.add_argument("--shard", metavar="K/N",
+                        help="render only the K-th of N stable partitions of the pages, plus a shard manifest")
+    parser.add_argument("--merge", nargs="+", metavar="DIR",
+                        help="combine the outputs of --shard builds into the output directory")
+    parser.add_argument("--watch", action="store_true",
+                        help="serve the output and rebuild affected pages when sources change")
+    parser.add_argument("--serve", action="store_true",
+                        help="serve pages rendered on demand instead of building the whole site")
+    parser.add_argument("--port", type=int, default=8888,
+                        help="port used by the --watch and --serve development servers")
+    parser.add_argument("--render-cache", type=int, default=64, metavar="MB",
+                        help="size of the --serve in-memory cache of rendered pages")
+    parser.add_argument("--site-url", metavar="URL",
+                        help="absolute site URL; enables sitemap.xml and feed.xml")
+    parser.add_argument("--profile", action="store_true",
+                        help="report per-stage timings and the slowest pages")
+    parser.add_argument("--profile-trace", metavar="PATH",
+                        help="write profiled stages as trace-event JSON to PATH")
+    parser.add_argument("--cprofile", metavar="PATH",
+                        help="write cProfile statistics for the build to PATH")
+    return parser.parse_args(argv)
 
-def generate_page_recursive(from_dir_path, template_path, dest_dir_path, basepath):
-    if not os.path.exists(from_dir_path) or not os.path.isdir(from_dir_path):
-        raise Exception(f"Source directory {from_dir_path} does not exist.")
-    if not os.path.exists(template_path) or not os.path.isfile(template_path):
-        raise Exception(f"Template file {template_path} does not exist.")
-    
-    for file in os.listdir(from_dir_path):
-        file_path = os.path.join(from_dir_path, file)
-        if os.path.isdir(file_path):
-            new_dest_dir = os.path.join(dest_dir_path, file)
-            generate_page_recursive(file_path, template_path, new_dest_dir, basepath)
-        elif file.endswith(".md"):
-            dest_file_path = os.path.join(dest_dir_path, file.replace(".md", ".html"))
-            generate_page(file_path, template_path, dest_file_path, basepath)
-
-def generate_static_site(from_path, template_path, dest_path, basepath):
-    static = "/home/deck/Documents/workspace/github/static-site-generator/static"
-    public = "/home/deck/Documents/workspace/github/static-site-generator/docs"
-    copy_directory(static, public)
-    generate_page_recursive(from_path, template_path, dest_path, basepath)
-
-def main():
-    basepath = sys.argv[1]
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    basepath = args.basepath
     if not basepath:
         basepath = "/"
 
-    generate_static_site(
-        "/home/deck/Documents/workspace/github/static-site-generator/content",
-        "/home/deck/Documents/workspace/github/static-site-generator/template.html",
-        "/home/deck/Documents/workspace/github/static-site-generator/docs",
-        basepath
+    shard = None
+    output = args.output
+    if args.shard:
+        shard = parse_shard(args.shard)
+        if output is None:
+            output = os.path.join(ROOT, "shards", f"{shard[0]}-of-{shard[1]}")
+    if output is None:
+        output = os.path.join(ROOT, "docs")
+
+    site = Site(args.content, args.template, output, args.static, basepath, args.site_url)
+    if args.serve:
+        serve_preview(site, args.port, args.render_cache * 1024 * 1024)
+        return
+    builder = Builder(
+        site,
+        jobs=args.jobs,
+        incremental=args.incremental,
+        link_assets=args.link_assets,
+        block_cache_path=args.block_cache,
+        fingerprint=args.fingerprint,
+        minify=args.minify,
+        compress=args.compress,
+        check_links=args.check_links,
+        strict_links=args.strict_links,
+        search=args.search,
+        search_shard_bytes=args.search_shard_kb * 1024,
     )
+    if args.watch:
+        builder.watch(args.port)
+        return
+
+    profiler = None
+    if args.profile or args.profile_trace:
+        profiler = BuildProfiler()
+    c_profiler = None
+    if args.cprofile:
+        c_profiler = cProfile.Profile()
+        c_profiler.enable()
+
+    if shard is not None:
+        builder.build_shard(*shard, profiler)
+    elif args.merge:
+        builder.merge(args.merge, profiler)
+    else:
+        builder.build(profiler)
+
+    if c_profiler is not None:
+        c_profiler.disable()
+        c_profiler.dump_stats(args.cprofile)
+    if profiler is not None:
+        print(profiler.report())
+        if args.profile_trace:
+            profiler.save_trace(args.profile_trace)
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
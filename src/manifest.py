@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+
+
+def hash_file(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_json(path):
+    # Missing or unreadable state reads as None, so callers fall back to a
+    # full rebuild of whatever it described.
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_json(path, data, indent=None, sort_keys=False):
+    json_dir = os.path.dirname(path)
+    if json_dir and not os.path.exists(json_dir):
+        os.makedirs(json_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent, sort_keys=sort_keys)
+    os.replace(tmp_path, path)
+
+def load_manifest(manifest_path):
+    manifest = load_json(manifest_path)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("pages"), dict):
+        return {"pages": {}}
+    return manifest
+
+def save_manifest(manifest_path, manifest):
+    save_json(manifest_path, manifest, indent=2, sort_keys=True)
+
+def manifest_entry(from_path, source_hash, template_hash, basepath, assets=""):
+    entry = {
+        "source": from_path,
+        "source_hash": source_hash,
+        "template_hash": template_hash,
+        "basepath": basepath,
+    }
+    if assets:
+        entry["assets"] = assets
+    return entry
+
+def is_page_current(manifest, dest_path, entry):
+    if not os.path.exists(dest_path):
+        return False
+    return manifest["pages"].get(dest_path) == entry
+
+def remove_stale_outputs(old_manifest, new_manifest):
+    removed = []
+    for dest_path in old_manifest["pages"]:
+        if dest_path in new_manifest["pages"]:
+            continue
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+            removed.append(dest_path)
+            dest_dir = os.path.dirname(dest_path)
+            if dest_dir and not os.listdir(dest_dir):
+                os.rmdir(dest_dir)
+    return removed
@@ -0,0 +1,132 @@
+import concurrent.futures
+import gzip
+import hashlib
+import os
+import re
+
+from manifest import load_json, save_json
+from sync import list_files
+from writer import write_if_changed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".json", ".svg", ".txt", ".xml"}
+# Content where whitespace is significant is passed through untouched.
+PRESERVED_HTML_PATTERN = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# Strings are matched alongside comments so quotes inside a comment, and
+# comment markers inside a string, are both handled.
+CSS_STRING_OR_COMMENT_PATTERN = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'|/\*.*?\*/)", re.DOTALL)
+CSS_PUNCTUATION_PATTERN = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_html(html):
+    parts = PRESERVED_HTML_PATTERN.split(html)
+    chunks = []
+    # split() yields text, the preserved element and its tag name, repeating.
+    for i in range(0, len(parts), 3):
+        chunks.append(WHITESPACE_PATTERN.sub(" ", parts[i]))
+        if i + 1 < len(parts):
+            chunks.append(parts[i + 1])
+    return "".join(chunks).strip()
+
+def minify_css_rules(css):
+    css = WHITESPACE_PATTERN.sub(" ", css)
+    css = CSS_PUNCTUATION_PATTERN.sub(r"\1", css)
+    return css.replace(": ", ":").replace(";}", "}")
+
+def minify_css(css):
+    parts = CSS_STRING_OR_COMMENT_PATTERN.split(css)
+    chunks = []
+    rules = []
+    # split() alternates between CSS and a string literal or comment; the CSS
+    # on both sides of a dropped comment is minified as one piece.
+    for i in range(0, len(parts), 2):
+        rules.append(parts[i])
+        if i + 1 < len(parts) and not parts[i + 1].startswith("/*"):
+            chunks.append(minify_css_rules("".join(rules)))
+            chunks.append(parts[i + 1])
+            rules = []
+    chunks.append(minify_css_rules("".join(rules)))
+    return "".join(chunks).strip()
+
+def minify(path, data):
+    if path.endswith(".html"):
+        return minify_html(data.decode("utf-8")).encode("utf-8")
+    if path.endswith(".css"):
+        return minify_css(data.decode("utf-8")).encode("utf-8")
+    return data
+
+def compressed_paths(path):
+    paths = [f"{path}.gz"]
+    if brotli is not None:
+        paths.append(f"{path}.br")
+    return paths
+
+def compress_file(path, data):
+    # mtime=0 keeps the .gz bytes stable across builds of the same content.
+    write_if_changed(f"{path}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        write_if_changed(f"{path}.br", brotli.compress(data))
+
+def process_output(path, minify_output, compress_output, known_hash):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if minify_output:
+        data = minify(path, data)
+    digest = hashlib.sha256(data).hexdigest()
+    write_if_changed(path, data)
+    compressed = False
+    if compress_output and (digest != known_hash or not all(os.path.exists(p) for p in compressed_paths(path))):
+        compress_file(path, data)
+        compressed = True
+    return digest, compressed
+
+def load_postprocess_state(state_path):
+    state = load_json(state_path)
+    if not isinstance(state, dict):
+        return {}
+    return state
+
+def postprocess_directory(output_dir, state_path=None, minify_output=True, compress_output=True, jobs=1):
+    old_state = load_postprocess_state(state_path)
+    state = {}
+    pending = []
+    for path in list_files(output_dir):
+        if os.path.splitext(path)[1] not in COMPRESSIBLE_EXTENSIONS:
+            continue
+        stat = os.stat(os.path.join(output_dir, path))
+        entry = old_state.get(path)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            state[path] = entry
+            continue
+        pending.append((path, None if entry is None else entry[2]))
+
+    args = [(os.path.join(output_dir, path), minify_output, compress_output, known_hash)
+            for path, known_hash in pending]
+    if jobs <= 1 or len(pending) <= 1:
+        results = [process_output(*job) for job in args]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(process_output, *zip(*args)))
+    processed = []
+    for (path, _), (digest, compressed) in zip(pending, results):
+        stat = os.stat(os.path.join(output_dir, path))
+        state[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        if compressed:
+            processed.append(path)
+
+    removed = []
+    for path in old_state:
+        if path in state:
+            continue
+        for compressed_path in compressed_paths(os.path.join(output_dir, path)):
+            if os.path.exists(compressed_path):
+                os.remove(compressed_path)
+                removed.append(compressed_path)
+    if state_path is not None:
+        save_json(state_path, state, indent=2, sort_keys=True)
+    return processed, removed
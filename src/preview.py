@@ -0,0 +1,205 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from generate import render_page
+
+
+class RenderCache():
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f"RenderCache(Entries:{len(self.entries)}, Bytes:{self.size}, Hits:{self.hits}, Misses:{self.misses})"
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, stamp):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != stamp:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key, stamp, body):
+        etag = body_etag(body)
+        with self.lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key)[1])
+            if len(body) > self.max_bytes:
+                return etag
+            self.entries[key] = (stamp, body, etag)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (_, old_body, _) = self.entries.popitem(last=False)
+                self.size -= len(old_body)
+        return etag
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+def body_etag(body):
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+def file_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+def etag_matches(header, etag):
+    if header is None:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+def strip_basepath(url_path, basepath):
+    path = unquote(urlsplit(url_path).path)
+    if basepath != "/" and path.startswith(basepath):
+        path = "/" + path[len(basepath):]
+    return path
+
+def resolve_source(path, content_dir):
+    relative = path.lstrip("/")
+    if relative == "" or relative.endswith("/"):
+        relative += "index.html"
+    root, ext = os.path.splitext(relative)
+    if ext != ".html":
+        return None
+    source = os.path.normpath(os.path.join(content_dir, f"{root}.md"))
+    if not source.startswith(content_dir + os.sep) or not os.path.isfile(source):
+        return None
+    return source
+
+class PreviewSite():
+    def __init__(self, site, max_bytes=64 * 1024 * 1024):
+        self.site = site
+        self.cache = RenderCache(max_bytes)
+        self.render_lock = threading.Lock()
+
+    def __repr__(self):
+        return f"PreviewSite({self.site}, {self.cache})"
+
+    def page_stamp(self, source):
+        stat = os.stat(source)
+        return (stat.st_mtime_ns, stat.st_size, os.stat(self.site.template_path).st_mtime_ns)
+
+    def render(self, source):
+        stamp = self.page_stamp(source)
+        cached = self.cache.get(source, stamp)
+        if cached is not None:
+            return cached
+        with self.render_lock:
+            cached = self.cache.get(source, stamp)
+            if cached is not None:
+                return cached
+            body = render_page(source, self.site.template_path, self.site.basepath)
+            return body, self.cache.put(source, stamp, body)
+
+class PreviewHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        self.serve(True)
+
+    def do_HEAD(self):
+        self.serve(False)
+
+    def serve(self, send_body):
+        preview = self.server.preview
+        path = strip_basepath(self.path, preview.site.basepath)
+        source = resolve_source(path, preview.site.content_dir)
+        if source is not None:
+            try:
+                body, etag = preview.render(source)
+            except Exception as e:
+                self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+                return
+            self.send_cached(body, etag, "text/html; charset=utf-8", send_body)
+            return
+
+        static_path = self.translate_path(path)
+        if not os.path.isfile(static_path):
+            if os.path.isdir(os.path.join(preview.site.content_dir, path.lstrip("/"))) and not path.endswith("/"):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", self.path.split("?", 1)[0] + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        with open(static_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            etag = file_etag(stat)
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                self.send_not_modified(etag)
+                return
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", self.guess_type(static_path))
+            self.send_header("Content-Length", str(stat.st_size))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            if send_body:
+                self.copyfile(f, self.wfile)
+
+    def send_cached(self, body, etag, content_type, send_body):
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_not_modified(etag)
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_not_modified(self, etag):
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+def start_preview_server(site, port, max_bytes=64 * 1024 * 1024):
+    server = ThreadingHTTPServer(("", port), partial(PreviewHandler, directory=site.static_dir))
+    server.preview = PreviewSite(site, max_bytes)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def serve_preview(site, port, max_bytes=64 * 1024 * 1024):
+    server = start_preview_server(site, port, max_bytes)
+    print(f"Previewing {site.content_dir} at http://localhost:{port}{site.basepath} (rendering on demand, Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(f"Render cache: {server.preview.cache.hits} hits, {server.preview.cache.misses} misses")
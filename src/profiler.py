@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class BuildProfiler():
+    def __init__(self):
+        self.events = []
+
+    def __repr__(self):
+        return f"BuildProfiler(Events:{len(self.events)})"
+
+    @contextmanager
+    def stage(self, name, page=None):
+        start_blocks = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            self.events.append({
+                "stage": name,
+                "page": page,
+                "start_ns": start,
+                "duration_ns": duration,
+                "allocated_blocks": sys.getallocatedblocks() - start_blocks,
+                "pid": os.getpid(),
+            })
+
+    def merge(self, other):
+        if other is not None:
+            self.events.extend(other.events)
+
+    def stage_totals(self):
+        totals = {}
+        for event in self.events:
+            total = totals.setdefault(event["stage"], {"duration_ns": 0, "allocated_blocks": 0, "count": 0})
+            total["duration_ns"] += event["duration_ns"]
+            total["allocated_blocks"] += event["allocated_blocks"]
+            total["count"] += 1
+        return totals
+
+    def page_totals(self):
+        totals = {}
+        for event in self.events:
+            if event["page"] is None:
+                continue
+            page = totals.setdefault(event["page"], {})
+            page[event["stage"]] = page.get(event["stage"], 0) + event["duration_ns"]
+        return totals
+
+    def report(self, top=10):
+        lines = ["Build profile", "Stages:"]
+        stage_totals = self.stage_totals()
+        for stage, total in sorted(stage_totals.items(), key=lambda item: -item[1]["duration_ns"]):
+            lines.append(f"  {stage:<14} {total['duration_ns'] / 1e6:10.3f} ms  {total['count']:6} calls  {total['allocated_blocks']:+10} blocks")
+        page_totals = self.page_totals()
+        if page_totals:
+            lines.append(f"Slowest pages (top {min(top, len(page_totals))}):")
+            ranked = sorted(page_totals.items(), key=lambda item: -sum(item[1].values()))
+            for page, stages in ranked[:top]:
+                slowest_stage = max(stages, key=stages.get)
+                lines.append(f"  {sum(stages.values()) / 1e6:10.3f} ms  {page}  (slowest stage: {slowest_stage})")
+        return "\n".join(lines)
+
+    def trace_events(self):
+        if not self.events:
+            return []
+        origin = min(event["start_ns"] for event in self.events)
+        return [
+            {
+                "name": event["stage"],
+                "cat": "build",
+                "ph": "X",
+                "ts": (event["start_ns"] - origin) / 1000,
+                "dur": event["duration_ns"] / 1000,
+                "pid": 0,
+                "tid": event["pid"],
+                "args": {"page": event["page"], "allocated_blocks": event["allocated_blocks"]},
+            }
+            for event in self.events
+        ]
+
+    def save_trace(self, trace_path):
+        with open(trace_path, 'w') as f:
+            json.dump({"traceEvents": self.trace_events()}, f)
+
+def profile_stage(profiler, name, page=None):
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(name, page)
@@ -0,0 +1,191 @@
+import json
+import os
+import re
+
+from blocktype import BlockType, iter_blocks
+from common import block_inline_text, extract_title, text_to_textnodes
+from frontmatter import split_front_matter
+from manifest import load_json, save_json
+from siteindex import page_url
+from textnode import TextType
+from writer import write_if_changed
+
+SEARCH_VERSION = 1
+SEARCH_DIR = "search"
+TOKEN_PATTERN = re.compile(r"\w+")
+LIST_TYPES = (BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST)
+
+
+def page_text_nodes(markdown):
+    for block in iter_blocks(markdown.splitlines()):
+        if block.block_type == BlockType.CODE:
+            continue
+        if block.block_type in LIST_TYPES:
+            texts = [block_inline_text([line], block.block_type) for line in block.lines]
+        else:
+            texts = [block_inline_text(block.lines, block.block_type)]
+        for text in texts:
+            yield from text_to_textnodes(text)
+
+def extract_page_text(markdown):
+    return " ".join(node.text for node in page_text_nodes(markdown) if node.text_type != TextType.IMAGE)
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+def term_positions(tokens):
+    positions = {}
+    for position, term in enumerate(tokens):
+        positions.setdefault(term, []).append(position)
+    return positions
+
+def delta_encode(positions):
+    encoded = []
+    previous = 0
+    for position in positions:
+        encoded.append(position - previous)
+        previous = position
+    return encoded
+
+def posting_size(term, postings):
+    return len(term) + 6 + sum(8 + 3 * len(positions) for positions in postings.values())
+
+def assign_shards(terms, sizes, max_bytes, depth=1):
+    groups = {}
+    for term in terms:
+        groups.setdefault(term[:depth], []).append(term)
+    shards = {}
+    for prefix, group in groups.items():
+        # A shard over the size budget is split on one more character, so a
+        # client finds a term's shard as the longest shard prefix of the term.
+        if (len(group) > 1 and sum(sizes[term] for term in group) > max_bytes
+                and any(len(term) > depth for term in group)):
+            shards.update(assign_shards(group, sizes, max_bytes, depth + 1))
+        else:
+            shards[prefix] = group
+    return shards
+
+def shard_file_name(prefix):
+    name = "".join(char if char.isascii() and char.isalnum() else f"_{ord(char):x}_" for char in prefix)
+    return f"{name}.json"
+
+class SearchIndex():
+    def __init__(self, max_shard_bytes=64 * 1024):
+        self.max_shard_bytes = max_shard_bytes
+        self.pages = {}
+        self.postings = {}
+        self.shards = {}
+        self.next_id = 0
+        self.dirty_terms = set()
+
+    def __repr__(self):
+        return f"SearchIndex(Pages:{len(self.pages)}, Terms:{len(self.postings)}, Shards:{len(self.shards)})"
+
+    def set_page(self, source, stamp, url, title, terms):
+        entry = self.pages.get(source)
+        if entry is None:
+            page_id = self.next_id
+            self.next_id += 1
+        else:
+            page_id = entry[1]
+            self.remove_postings(page_id, entry[4])
+        self.pages[source] = [stamp, page_id, url, title, terms]
+        for term, positions in terms.items():
+            self.postings.setdefault(term, {})[page_id] = positions
+        self.dirty_terms.update(terms)
+
+    def remove_page(self, source):
+        entry = self.pages.pop(source, None)
+        if entry is not None:
+            self.remove_postings(entry[1], entry[4])
+
+    def remove_postings(self, page_id, terms):
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(page_id, None)
+            if not postings:
+                del self.postings[term]
+            self.dirty_terms.add(term)
+
+    def update_pages(self, pages, output_dir):
+        current = set()
+        updated = []
+        for source, dest_path in pages:
+            current.add(source)
+            stat = os.stat(source)
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            entry = self.pages.get(source)
+            if entry is not None and entry[0] == stamp:
+                continue
+            with open(source, 'r') as f:
+                metadata, body = split_front_matter(f.read())
+            title = str(metadata.get("title") or extract_title(body))
+            terms = term_positions(tokenize(extract_page_text(body)))
+            self.set_page(source, stamp, page_url(dest_path, output_dir), title, terms)
+            updated.append(source)
+        for source in set(self.pages) - current:
+            self.remove_page(source)
+            updated.append(source)
+        return updated
+
+    def shard_data(self, terms):
+        data = {}
+        for term in terms:
+            data[term] = [[page_id, *delta_encode(positions)]
+                          for page_id, positions in sorted(self.postings[term].items())]
+        return data
+
+    def write(self, output_dir):
+        search_dir = os.path.join(output_dir, SEARCH_DIR)
+        os.makedirs(search_dir, exist_ok=True)
+        sizes = {term: posting_size(term, postings) for term, postings in self.postings.items()}
+        shards = assign_shards(sorted(sizes), sizes, self.max_shard_bytes)
+
+        written = []
+        for prefix, terms in shards.items():
+            shard_path = os.path.join(search_dir, shard_file_name(prefix))
+            if (self.shards.get(prefix) == terms and self.dirty_terms.isdisjoint(terms)
+                    and os.path.exists(shard_path)):
+                continue
+            data = json.dumps(self.shard_data(terms), ensure_ascii=False, separators=(",", ":"))
+            if write_if_changed(shard_path, data.encode("utf-8")):
+                written.append(shard_path)
+        for prefix in set(self.shards) - set(shards):
+            shard_path = os.path.join(search_dir, shard_file_name(prefix))
+            if os.path.exists(shard_path):
+                os.remove(shard_path)
+
+        manifest = {
+            "version": SEARCH_VERSION,
+            "pages": {page_id: [url, title] for _, page_id, url, title, _ in self.pages.values()},
+            "shards": {prefix: shard_file_name(prefix) for prefix in sorted(shards)},
+        }
+        manifest_path = os.path.join(search_dir, "index.json")
+        data = json.dumps(manifest, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        if write_if_changed(manifest_path, data.encode("utf-8")):
+            written.append(manifest_path)
+        self.shards = shards
+        self.dirty_terms.clear()
+        return written
+
+    def load(self, index_path):
+        data = load_json(index_path)
+        if not isinstance(data, dict) or data.get("version") != SEARCH_VERSION:
+            return
+        self.next_id = data["next_id"]
+        for source, (stamp, page_id, url, title, terms) in data["pages"].items():
+            self.pages[source] = [stamp, page_id, url, title, terms]
+            for term, positions in terms.items():
+                self.postings.setdefault(term, {})[page_id] = positions
+        self.shards = data["shards"]
+        self.dirty_terms.clear()
+
+    def save(self, index_path):
+        save_json(index_path, {
+            "version": SEARCH_VERSION,
+            "next_id": self.next_id,
+            "pages": self.pages,
+            "shards": self.shards,
+        })
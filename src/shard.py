@@ -0,0 +1,101 @@
+import hashlib
+import os
+
+from siteindex import page_info_entry, page_info_from_entry, read_page_info
+from sync import sync_file
+from manifest import hash_file, load_json, save_json
+
+SHARD_MANIFEST = "shard-manifest.json"
+SHARD_VERSION = 1
+
+
+def parse_shard(value):
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise Exception(f"Invalid shard {value}, expected K/N such as 1/4.")
+    if count < 1 or not 1 <= index <= count:
+        raise Exception(f"Invalid shard {value}, K must be between 1 and N.")
+    return index, count
+
+def shard_of(relative_path, count):
+    # A content hash of the path (not hash()) keeps the partition identical on
+    # every machine and Python process.
+    digest = hashlib.sha256(relative_path.replace(os.sep, "/").encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+def partition_pages(pages, from_dir_path, index, count):
+    return [(file_path, dest_file_path) for file_path, dest_file_path in pages
+            if shard_of(os.path.relpath(file_path, from_dir_path), count) == index]
+
+def write_shard_manifest(pages, from_dir_path, dest_dir_path, index, count):
+    entries = {}
+    for file_path, dest_file_path in pages:
+        page = read_page_info(file_path, dest_file_path, from_dir_path, dest_dir_path)
+        entries[os.path.relpath(dest_file_path, dest_dir_path)] = {
+            "output_hash": hash_file(dest_file_path),
+            "page": page_info_entry(page, from_dir_path, dest_dir_path),
+        }
+    manifest = {"version": SHARD_VERSION, "shard": index, "count": count, "pages": entries}
+    save_json(os.path.join(dest_dir_path, SHARD_MANIFEST), manifest, indent=2, sort_keys=True)
+    return manifest
+
+def load_shard_manifest(shard_dir):
+    manifest_path = os.path.join(shard_dir, SHARD_MANIFEST)
+    if not os.path.exists(manifest_path):
+        raise Exception(f"Shard directory {shard_dir} has no {SHARD_MANIFEST}.")
+    manifest = load_json(manifest_path)
+    if not isinstance(manifest, dict) or manifest.get("version") != SHARD_VERSION:
+        raise Exception(f"Shard manifest {manifest_path} has an unsupported version.")
+    return manifest
+
+def verify_shards(manifests, expected_pages):
+    counts = {manifest["count"] for _, manifest in manifests}
+    if len(counts) != 1:
+        raise Exception(f"Shards disagree on the shard count: {sorted(counts)}")
+    count = counts.pop()
+    seen = {}
+    for shard_dir, manifest in manifests:
+        if manifest["shard"] in seen:
+            raise Exception(f"Shard {manifest['shard']}/{count} appears in both {seen[manifest['shard']]} and {shard_dir}")
+        seen[manifest["shard"]] = shard_dir
+    missing_shards = sorted(set(range(1, count + 1)) - set(seen))
+    if missing_shards:
+        raise Exception(f"Missing shard(s) {', '.join(f'{shard}/{count}' for shard in missing_shards)}")
+
+    owners = {}
+    errors = []
+    for shard_dir, manifest in manifests:
+        for dest_path, entry in manifest["pages"].items():
+            if dest_path in owners:
+                errors.append(f"{dest_path} is duplicated in {owners[dest_path]} and {shard_dir}")
+                continue
+            owners[dest_path] = shard_dir
+            if shard_of(entry["page"]["source"], count) != manifest["shard"]:
+                errors.append(f"{dest_path} does not belong to shard {manifest['shard']}/{count}")
+    for dest_path in sorted(set(expected_pages) - set(owners)):
+        errors.append(f"{dest_path} is missing from every shard")
+    for dest_path in sorted(set(owners) - set(expected_pages)):
+        errors.append(f"{dest_path} has no source page")
+    if errors:
+        raise Exception("Shard merge failed:\n" + "\n".join(errors))
+    return owners
+
+def load_shards(shard_dirs, expected_pages):
+    manifests = [(shard_dir, load_shard_manifest(shard_dir)) for shard_dir in shard_dirs]
+    owners = verify_shards(manifests, expected_pages)
+    for shard_dir, manifest in manifests:
+        for dest_path, entry in sorted(manifest["pages"].items()):
+            shard_path = os.path.join(shard_dir, dest_path)
+            if not os.path.exists(shard_path) or hash_file(shard_path) != entry["output_hash"]:
+                raise Exception(f"Shard merge failed: {shard_path} does not match its manifest")
+    return manifests, owners
+
+def merge_shards(manifests, from_dir_path, dest_dir_path):
+    index = []
+    for shard_dir, manifest in manifests:
+        for dest_path, entry in sorted(manifest["pages"].items()):
+            sync_file(os.path.join(shard_dir, dest_path), os.path.join(dest_dir_path, dest_path))
+            index.append(page_info_from_entry(entry["page"], from_dir_path, dest_dir_path))
+    index.sort(key=lambda page: page.source)
+    return index
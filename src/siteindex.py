@@ -0,0 +1,297 @@
+import os
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from frontmatter import read_front_matter
+from common import line_title, text_to_textnodes
+from htmlnode import LeafNode, ParentNode
+from manifest import load_json, load_manifest, save_json, save_manifest, remove_stale_outputs
+from template import load_template, prefix_basepath
+from writer import write_if_changed
+
+SUMMARY_LENGTH = 200
+FEED_ITEMS = 20
+PAGE_INFO_VERSION = 1
+SUMMARY_SKIP_PREFIXES = ("#", "!", ">", "-", "```", "[", "|")
+
+
+class PageInfo():
+    __slots__ = ("title", "date", "tags", "url", "source", "dest", "summary", "section", "metadata")
+
+    def __init__(self, title, url, source, dest, date=None, tags=None, summary="", section=None, metadata=None):
+        self.title = title
+        self.url = url
+        self.source = source
+        self.dest = dest
+        self.date = date
+        self.tags = tags or []
+        self.summary = summary
+        self.section = section
+        self.metadata = metadata or {}
+
+    def __eq__(self, value):
+        return (self.title, self.url, self.date, self.tags, self.summary) == (value.title, value.url, value.date, value.tags, value.summary)
+
+    def __repr__(self):
+        return f"PageInfo({self.title}, {self.url}, {self.date}, {self.tags})"
+
+def page_url(dest_path, dest_dir_path):
+    relative_path = os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+    if relative_path == "index.html":
+        return "/"
+    if relative_path.endswith("/index.html"):
+        return f"/{relative_path[:-len('index.html')]}"
+    return f"/{relative_path}"
+
+def add_summary_line(paragraph, line):
+    # Returns True once the first paragraph is complete.
+    stripped = line.strip()
+    if not stripped:
+        return bool(paragraph)
+    if not paragraph and stripped.startswith(SUMMARY_SKIP_PREFIXES):
+        return False
+    paragraph.append(stripped)
+    return False
+
+def summary_text(paragraph):
+    text = "".join(node.text for node in text_to_textnodes(" ".join(paragraph)))
+    if len(text) > SUMMARY_LENGTH:
+        text = text[:SUMMARY_LENGTH].rsplit(" ", 1)[0] + "..."
+    return text
+
+def extract_summary(body):
+    paragraph = []
+    for line in body.splitlines():
+        if add_summary_line(paragraph, line):
+            break
+    return summary_text(paragraph)
+
+def scan_page_lines(lines, need_title, need_summary):
+    # Reads only as far as the title and the first paragraph.
+    title = None
+    paragraph = []
+    title_done = not need_title
+    summary_done = not need_summary
+    for line in lines:
+        if not title_done:
+            title = line_title(line)
+            if title is not None:
+                if title is False:
+                    title = None
+                title_done = True
+        if not summary_done:
+            summary_done = add_summary_line(paragraph, line)
+        if title_done and summary_done:
+            break
+    if need_title and title is None:
+        raise Exception("No title found in markdown")
+    return title, summary_text(paragraph) if need_summary else ""
+
+def read_page_info(from_path, dest_path, from_dir_path, dest_dir_path):
+    with open(from_path, 'r') as f:
+        metadata, lines = read_front_matter(line.rstrip("\r\n") for line in f)
+        title, summary = scan_page_lines(lines, not metadata.get("title"), not metadata.get("summary"))
+    title = metadata.get("title") or title
+    tags = metadata.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    relative_parts = os.path.relpath(from_path, from_dir_path).split(os.sep)
+    section = None
+    if len(relative_parts) > 2 or (len(relative_parts) == 2 and relative_parts[1] != "index.md"):
+        section = relative_parts[0]
+    return PageInfo(
+        str(title),
+        page_url(dest_path, dest_dir_path),
+        from_path,
+        dest_path,
+        date=str(metadata["date"]) if metadata.get("date") else None,
+        tags=[str(tag) for tag in tags],
+        summary=metadata.get("summary") or summary,
+        section=section,
+        metadata=metadata,
+    )
+
+def page_info_entry(page, from_dir_path, dest_dir_path):
+    return {
+        "title": page.title,
+        "url": page.url,
+        "source": os.path.relpath(page.source, from_dir_path),
+        "dest": os.path.relpath(page.dest, dest_dir_path),
+        "date": page.date,
+        "tags": page.tags,
+        "summary": page.summary,
+        "section": page.section,
+        "metadata": page.metadata,
+    }
+
+def page_info_from_entry(entry, from_dir_path, dest_dir_path):
+    return PageInfo(
+        entry["title"],
+        entry["url"],
+        os.path.join(from_dir_path, entry["source"]),
+        os.path.join(dest_dir_path, entry["dest"]),
+        date=entry["date"],
+        tags=entry["tags"],
+        summary=entry["summary"],
+        section=entry["section"],
+        metadata=entry["metadata"],
+    )
+
+def load_page_info_cache(cache_path, from_dir_path, dest_dir_path):
+    data = load_json(cache_path)
+    if not isinstance(data, dict) or data.get("version") != PAGE_INFO_VERSION:
+        return {}
+    info_cache = {}
+    for (mtime_ns, size), entry in data["pages"]:
+        page = page_info_from_entry(entry, from_dir_path, dest_dir_path)
+        info_cache[page.source] = ((mtime_ns, size, page.dest), page)
+    return info_cache
+
+def save_page_info_cache(cache_path, info_cache, from_dir_path, dest_dir_path):
+    save_json(cache_path, {
+        "version": PAGE_INFO_VERSION,
+        "pages": [[key[:2], page_info_entry(page, from_dir_path, dest_dir_path)]
+                  for key, page in info_cache.values()],
+    })
+
+def build_page_index(pages, from_dir_path, dest_dir_path, info_cache=None):
+    if info_cache is None:
+        return [read_page_info(from_path, dest_path, from_dir_path, dest_dir_path) for from_path, dest_path in pages]
+    index = []
+    for from_path, dest_path in pages:
+        stat = os.stat(from_path)
+        key = (stat.st_mtime_ns, stat.st_size, dest_path)
+        cached = info_cache.get(from_path)
+        if cached is None or cached[0] != key:
+            cached = (key, read_page_info(from_path, dest_path, from_dir_path, dest_dir_path))
+            info_cache[from_path] = cached
+        index.append(cached[1])
+    for from_path in set(info_cache) - {from_path for from_path, _ in pages}:
+        del info_cache[from_path]
+    return index
+
+def sort_by_date(pages):
+    undated = sorted((page for page in pages if not page.date), key=lambda page: page.title)
+    dated = sorted((page for page in pages if page.date), key=lambda page: page.date, reverse=True)
+    return dated + undated
+
+def tag_slug(tag):
+    return re.sub(r"[^a-z0-9]+", "-", tag.lower()).strip("-") or "tag"
+
+def listing_node(pages, basepath):
+    items = []
+    for page in sort_by_date(pages):
+        children = [LeafNode("a", page.title, {"href": prefix_basepath(page.url, basepath)})]
+        if page.date:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("time", page.date))
+        if page.summary:
+            children.append(LeafNode("p", page.summary))
+        items.append(ParentNode("li", children))
+    return ParentNode("ul", items)
+
+def write_listing_page(dest_path, title, node, template):
+    html = template.render_to_string({"Title": title, "Content": node.write_html})
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    write_if_changed(dest_path, html.encode("utf-8"))
+
+def generate_listings(index, template_path, dest_dir_path, basepath, from_dir_path):
+    template = load_template(template_path, basepath)
+    written = []
+    sections = {}
+    for page in index:
+        if page.section is not None:
+            sections.setdefault(page.section, []).append(page)
+    for section, pages in sorted(sections.items()):
+        if os.path.exists(os.path.join(from_dir_path, section, "index.md")):
+            continue
+        dest_path = os.path.join(dest_dir_path, section, "index.html")
+        title = section.replace("-", " ").replace("_", " ").title()
+        write_listing_page(dest_path, title, ParentNode("div", [LeafNode("h1", title), listing_node(pages, basepath)]), template)
+        written.append(dest_path)
+
+    tags = {}
+    for page in index:
+        for tag in page.tags:
+            tags.setdefault(tag, []).append(page)
+    if tags:
+        tag_items = []
+        for tag, pages in sorted(tags.items()):
+            url = f"/tags/{tag_slug(tag)}/"
+            dest_path = os.path.join(dest_dir_path, "tags", tag_slug(tag), "index.html")
+            write_listing_page(dest_path, f"Tagged {tag}", ParentNode("div", [LeafNode("h1", f"Tagged {tag}"), listing_node(pages, basepath)]), template)
+            written.append(dest_path)
+            tag_items.append(ParentNode("li", [LeafNode("a", f"{tag} ({len(pages)})", {"href": prefix_basepath(url, basepath)})]))
+        dest_path = os.path.join(dest_dir_path, "tags", "index.html")
+        write_listing_page(dest_path, "Tags", ParentNode("div", [LeafNode("h1", "Tags"), ParentNode("ul", tag_items)]), template)
+        written.append(dest_path)
+    return written
+
+def absolute_url(url, site_url, basepath):
+    return f"{site_url.rstrip('/')}{prefix_basepath(url, basepath)}"
+
+def generate_sitemap(index, site_url, basepath):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for page in sorted(index, key=lambda page: page.url):
+        lines.append(f"  <url><loc>{escape(absolute_url(page.url, site_url, basepath))}</loc>"
+                     + (f"<lastmod>{escape(page.date)}</lastmod>" if page.date else "") + "</url>")
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+def feed_date(date):
+    try:
+        parsed = datetime.fromisoformat(date)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return format_datetime(parsed)
+
+def generate_feed(index, site_url, basepath, site_title):
+    posts = sort_by_date([page for page in index if page.section is not None])[:FEED_ITEMS]
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0">',
+        "<channel>",
+        f"  <title>{escape(site_title)}</title>",
+        f"  <link>{escape(absolute_url('/', site_url, basepath))}</link>",
+        f"  <description>{escape(site_title)}</description>",
+    ]
+    for page in posts:
+        link = escape(absolute_url(page.url, site_url, basepath))
+        lines.append("  <item>")
+        lines.append(f"    <title>{escape(page.title)}</title>")
+        lines.append(f"    <link>{link}</link>")
+        lines.append(f"    <guid>{link}</guid>")
+        if page.date and feed_date(page.date):
+            lines.append(f"    <pubDate>{feed_date(page.date)}</pubDate>")
+        if page.summary:
+            lines.append(f"    <description>{escape(page.summary)}</description>")
+        lines.append("  </item>")
+    lines.extend(["</channel>", "</rss>"])
+    return "\n".join(lines) + "\n"
+
+def generate_site_index(pages, from_dir_path, template_path, dest_dir_path, basepath, site_url=None, info_cache=None,
+                        manifest_path=None):
+    index = build_page_index(pages, from_dir_path, dest_dir_path, info_cache)
+    return index, write_site_artifacts(index, from_dir_path, template_path, dest_dir_path, basepath, site_url,
+                                       manifest_path)
+
+def write_site_artifacts(index, from_dir_path, template_path, dest_dir_path, basepath, site_url=None, manifest_path=None):
+    written = generate_listings(index, template_path, dest_dir_path, basepath, from_dir_path)
+    if site_url:
+        site_title = next((page.title for page in index if page.url == "/"), "Feed")
+        for name, data in (("sitemap.xml", generate_sitemap(index, site_url, basepath)),
+                           ("feed.xml", generate_feed(index, site_url, basepath, site_title))):
+            dest_path = os.path.join(dest_dir_path, name)
+            write_if_changed(dest_path, data.encode("utf-8"))
+            written.append(dest_path)
+    if manifest_path is not None:
+        # Listings for sections and tags that no longer exist are removed
+        # like stale pages.
+        manifest = {"pages": {dest_path: {} for dest_path in written}}
+        remove_stale_outputs(load_manifest(manifest_path), manifest)
+        save_manifest(manifest_path, manifest)
+    return written
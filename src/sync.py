@@ -0,0 +1,123 @@
+import concurrent.futures
+import os
+import shutil
+
+from manifest import load_json, save_json
+
+
+def list_files(root):
+    files = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            files.append(os.path.relpath(os.path.join(dir_path, file_name), root))
+    return files
+
+def file_stamp(src_path, dst_path):
+    src_stat = os.stat(src_path)
+    dst_stat = os.stat(dst_path)
+    return [src_stat.st_size, src_stat.st_mtime_ns, dst_stat.st_size, dst_stat.st_mtime_ns]
+
+def is_asset_current(src_path, dst_path, link, stamp=None):
+    try:
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src_path)
+    if stamp is not None:
+        # A transformed copy differs from its source, so it is current when
+        # neither side changed since it was written.
+        return stamp == [src_stat.st_size, src_stat.st_mtime_ns, dst_stat.st_size, dst_stat.st_mtime_ns]
+    if link:
+        return os.path.samestat(src_stat, dst_stat)
+    return src_stat.st_size == dst_stat.st_size and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+def copy_file_contents(src_path, dst_path):
+    # copy_file_range lets the kernel copy (or reflink, on filesystems that
+    # support it) without moving the data through user space.
+    if not hasattr(os, "copy_file_range"):
+        shutil.copyfile(src_path, dst_path)
+        return
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError:
+            remaining = -1
+    if remaining != 0:
+        shutil.copyfile(src_path, dst_path)
+
+def sync_file(src_path, dst_path, link=False, transform=None):
+    dst_dir = os.path.dirname(dst_path)
+    if dst_dir:
+        os.makedirs(dst_dir, exist_ok=True)
+    if transform is not None:
+        with open(src_path, 'rb') as f:
+            data = f.read()
+        transformed = transform(dst_path, data)
+        if transformed != data:
+            tmp_path = f"{dst_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(transformed)
+            os.replace(tmp_path, dst_path)
+            return True
+    if link:
+        if os.path.lexists(dst_path):
+            os.remove(dst_path)
+        try:
+            os.link(src_path, dst_path)
+            return False
+        except OSError:
+            pass
+    tmp_path = f"{dst_path}.tmp"
+    copy_file_contents(src_path, tmp_path)
+    shutil.copystat(src_path, tmp_path)
+    os.replace(tmp_path, dst_path)
+    return False
+
+def load_synced_files(state_path):
+    state = load_json(state_path)
+    if not isinstance(state, dict):
+        return [], {}
+    return state.get("files", []), state.get("transformed", {})
+
+def save_synced_files(state_path, files, transformed=None):
+    save_json(state_path, {"files": files, "transformed": transformed or {}}, indent=2)
+
+def sync_directory(src, dst, state_path=None, link=False, threads=8, transform=None):
+    if not os.path.exists(src):
+        raise Exception(f"Directory {src} does not exist.")
+    os.makedirs(dst, exist_ok=True)
+    files = list_files(src)
+    current = set(files)
+    synced, stamps = load_synced_files(state_path)
+    # Stamps of transformed copies only hold while the same transform runs.
+    if transform is None:
+        stamps = {}
+    changed = [path for path in files
+               if not is_asset_current(os.path.join(src, path), os.path.join(dst, path), link, stamps.get(path))]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(sync_file, os.path.join(src, path), os.path.join(dst, path), link, transform)
+                   for path in changed]
+        unchanged = current.difference(changed)
+        transformed = {path: stamp for path, stamp in stamps.items() if path in unchanged}
+        for path, future in zip(changed, futures):
+            if future.result():
+                transformed[path] = file_stamp(os.path.join(src, path), os.path.join(dst, path))
+
+    # Only files recorded by a previous sync are removed, so generated pages
+    # living in the same output directory are never touched.
+    removed = []
+    for path in synced:
+        dst_path = os.path.join(dst, path)
+        if path not in current and os.path.exists(dst_path):
+            os.remove(dst_path)
+            removed.append(path)
+    if state_path is not None:
+        save_synced_files(state_path, files, transformed)
+    return changed, removed
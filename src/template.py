@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+URL_ATTRIBUTE_PATTERN = re.compile(r'(href=|src=)("?)(/[^"\s>]*)')
+
+# Root-relative asset URLs mapped to their fingerprinted names. Rewritten
+# together with the basepath, so the map's version is part of every key that
+# caches rewritten HTML.
+asset_urls = {}
+asset_urls_version = ""
+
+
+def set_asset_urls(urls):
+    global asset_urls_version
+    asset_urls.clear()
+    asset_urls.update(urls)
+    asset_urls_version = ""
+    if urls:
+        asset_urls_version = hashlib.sha256(json.dumps(urls, sort_keys=True).encode()).hexdigest()[:16]
+
+def asset_version():
+    return asset_urls_version
+
+def rewrite_basepath(html, basepath):
+    if basepath == "/" and not asset_urls:
+        return html
+    return URL_ATTRIBUTE_PATTERN.sub(
+        lambda match: f"{match.group(1)}{match.group(2)}{prefix_basepath(match.group(3), basepath)}", html)
+
+def prefix_basepath(url, basepath):
+    if url is None or not url.startswith("/"):
+        return url
+    url = asset_urls.get(url, url)
+    if basepath == "/":
+        return url
+    return f"{basepath}{url[1:]}"
+
+class CompiledTemplate():
+    def __init__(self, template, basepath="/"):
+        self.parts = []
+        self.slots = set()
+        position = 0
+        for match in SLOT_PATTERN.finditer(template):
+            self.parts.append(rewrite_basepath(template[position:match.start()], basepath))
+            self.parts.append((match.group(1), match.group(0)))
+            self.slots.add(match.group(1))
+            position = match.end()
+        self.parts.append(rewrite_basepath(template[position:], basepath))
+
+    def __repr__(self):
+        return f"CompiledTemplate(Slots:{sorted(self.slots)})"
+
+    def render(self, write, values):
+        for part in self.parts:
+            if isinstance(part, str):
+                write(part)
+                continue
+            name, placeholder = part
+            value = values.get(name)
+            if value is None:
+                write(placeholder)
+            elif callable(value):
+                value(write)
+            else:
+                write(str(value))
+
+    def render_to_string(self, values):
+        chunks = []
+        self.render(chunks.append, values)
+        return "".join(chunks)
+
+@lru_cache(maxsize=16)
+def compile_template_file(template_path, basepath, mtime_ns, assets):
+    with open(template_path, 'r') as f:
+        return CompiledTemplate(f.read(), basepath)
+
+def load_template(template_path, basepath="/"):
+    if not os.path.exists(template_path) or not os.path.isfile(template_path):
+        raise Exception(f"Template file {template_path} does not exist.")
+    return compile_template_file(template_path, basepath, os.stat(template_path).st_mtime_ns, asset_urls_version)
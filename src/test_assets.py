@@ -0,0 +1,68 @@
+import json
+import os
+import unittest
+
+from assets import ASSET_MANIFEST, fingerprint_assets, fingerprint_path, hash_assets
+from common import markdown_to_htmlnode
+from template import CompiledTemplate, set_asset_urls
+from fixtures import TempDirTestCase
+
+
+class TestAssets(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dst = os.path.join(self.tmp.name, "docs")
+        self.cache_path = os.path.join(self.tmp.name, ".cache", "asset-hashes.json")
+
+    def tearDown(self):
+        set_asset_urls({})
+
+    def test_fingerprint_path(self):
+        self.assertEqual(os.path.join("images", "tolkien.0123456789ab.png"),
+                         fingerprint_path(os.path.join("images", "tolkien.png"), "0123456789abcdef"))
+        self.assertEqual("LICENSE.0123456789ab", fingerprint_path("LICENSE", "0123456789abcdef"))
+
+    def test_hash_cache(self):
+        self.write("static/index.css", "body {}")
+        cache = {}
+        digests, hashed = hash_assets(self.src, cache)
+        self.assertEqual(["index.css"], hashed)
+        cache["index.css"][2] = "cached"
+        digests, hashed = hash_assets(self.src, cache)
+        self.assertEqual([], hashed)
+        self.assertEqual({"index.css": "cached"}, digests)
+
+    def test_fingerprint_assets(self):
+        self.write("static/index.css", "body {}")
+        self.write("static/images/a.png", "png")
+        urls, hashed, written, _ = fingerprint_assets(self.src, self.dst, self.cache_path)
+        self.assertEqual(2, len(hashed))
+        css_url = urls["/index.css"]
+        self.assertRegex(css_url, r"^/index\.[0-9a-f]{12}\.css$")
+        with open(os.path.join(self.dst, css_url[1:]), 'r') as f:
+            self.assertEqual("body {}", f.read())
+        with open(os.path.join(self.dst, ASSET_MANIFEST), 'r') as f:
+            self.assertEqual(urls, json.load(f))
+
+        _, hashed, written, removed = fingerprint_assets(self.src, self.dst, self.cache_path)
+        self.assertEqual(([], [], []), (hashed, written, removed))
+
+        self.write("static/index.css", "body { margin: 0 }")
+        urls, hashed, written, removed = fingerprint_assets(self.src, self.dst, self.cache_path)
+        self.assertEqual(["index.css"], hashed)
+        self.assertEqual([css_url], removed)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, css_url[1:])))
+        self.assertNotEqual(css_url, urls["/index.css"])
+
+    def test_rewrite_with_basepath(self):
+        set_asset_urls({"/index.css": "/index.abc.css", "/images/a.png": "/images/a.def.png"})
+        template = CompiledTemplate('<link href="/index.css" /><a href="/blog/">{{ Content }}</a>', "/site/")
+        self.assertEqual('<link href="/site/index.abc.css" /><a href="/site/blog/">', template.parts[0])
+        self.assertEqual(
+            '<div><p><img src=/images/a.def.png alt=a></img><a href=/index.html>home</a></p></div>',
+            markdown_to_htmlnode("![a](/images/a.png)[home](/index.html)").to_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
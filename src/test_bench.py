@@ -0,0 +1,20 @@
+import unittest
+
+from bench import run_benchmarks, link_heavy_corpus, small_pages_corpus
+
+
+class TestBench(unittest.TestCase):
+    def test_corpus_generators(self):
+        self.assertIn("](/issues/0/0)", link_heavy_corpus(0.01))
+        self.assertEqual(len(small_pages_corpus(0.01)), 10)
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(scale=0.01, repeat=1)
+        self.assertEqual(set(results), {"link_heavy", "long_lists", "huge_code_block", "small_pages"})
+        for stage in ("markdown_to_blocks", "block_to_blocktype", "text_to_textnodes", "to_html", "template", "generate_page"):
+            self.assertIn(stage, results["link_heavy"])
+        self.assertGreaterEqual(results["small_pages"]["generate_page"]["min"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+from builder import Site, Builder
+from template import set_asset_urls
+from fixtures import TempDirTestCase
+
+
+class TestBuilder(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<title>{{ Title }}</title><article>{{ Content }}</article>")
+        self.write("static/style.css", "body {}")
+        self.site = Site.from_root(self.dir)
+        self.builder = Builder(self.site, incremental=True)
+
+    def tearDown(self):
+        set_asset_urls({})
+
+    def read(self, *parts):
+        with open(os.path.join(self.dir, "docs", *parts), 'r') as f:
+            return f.read()
+
+    def build(self):
+        with redirect_stdout(io.StringIO()):
+            return self.builder.build()
+
+    def rebuild(self, changed):
+        with redirect_stdout(io.StringIO()):
+            return self.builder.rebuild(changed)
+
+    def test_build(self):
+        self.write("content/index.md", "# Home")
+        self.write("content/a/index.md", "# A")
+        pages = self.build()
+        self.assertEqual(2, len(pages))
+        self.assertEqual("<title>Home</title><article><div><h1>Home</h1></div></article>", self.read("index.html"))
+        self.assertEqual("body {}", self.read("style.css"))
+        self.assertEqual(2, len(self.builder.index))
+
+    def test_build_reuses_page_info(self):
+        source = self.write("content/index.md", "# Home")
+        self.build()
+        cached = self.builder.page_info_cache[source]
+        self.build()
+        self.assertIs(cached, self.builder.page_info_cache[source])
+        self.assertEqual(2, self.builder.builds)
+
+    def test_page_info_persists_across_builders(self):
+        source = self.write("content/blog/post/index.md", "---\ntags: [elves]\n---\n# Post\n\nSummary.")
+        self.build()
+        builder = Builder(self.site, incremental=True)
+        with redirect_stdout(io.StringIO()):
+            builder.track_pages([(source, os.path.join(self.dir, "docs", "blog", "post", "index.html"))])
+            builder.update_index()
+        key, page = builder.page_info_cache[source]
+        self.assertEqual(("Post", "Summary.", ["elves"]), (page.title, page.summary, page.tags))
+        self.assertEqual(page, self.builder.page_info_cache[source][1])
+
+    def test_removes_stale_listings(self):
+        self.write("content/blog/post/index.md", "---\ntags: [hobbits, elves]\n---\n# Post")
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.dir, "docs", "tags", "hobbits", "index.html")))
+        self.write("content/blog/post/index.md", "---\ntags: [elves]\n---\n# Post")
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dir, "docs", "tags", "hobbits")))
+        self.assertNotIn("hobbits", self.read("tags", "index.html"))
+
+    def test_cache_dir_is_per_output(self):
+        other = Site(self.site.content_dir, self.site.template_path, os.path.join(self.dir, "other"))
+        self.assertNotEqual(self.site.cache_dir, other.cache_dir)
+        self.assertEqual(os.path.join(self.dir, ".cache"), os.path.dirname(self.site.cache_dir))
+        self.assertEqual(self.site.cache_dir, Site.from_root(self.dir).cache_dir)
+
+    def test_render(self):
+        source = self.write("content/index.md", "# Home\n\n[link](/a)")
+        site = Site.from_root(self.dir, "/site/")
+        self.assertEqual(
+            b'<title>Home</title><article><div><h1>Home</h1><p><a href=/site/a>link</a></p></div></article>',
+            Builder(site).render(source))
+
+    def test_rebuild(self):
+        first = self.write("content/a/index.md", "# A")
+        second = self.write("content/b/index.md", "# B")
+        self.build()
+
+        self.write("content/a/index.md", "# A changed")
+        affected = self.rebuild({first})
+        self.assertSetEqual({os.path.join(self.site.output_dir, "a", "index.html")}, affected)
+        self.assertIn("A changed", self.read("a", "index.html"))
+
+        os.remove(second)
+        self.rebuild({second})
+        self.assertFalse(os.path.exists(os.path.join(self.site.output_dir, "b")))
+
+        third = self.write("content/c/index.md", "# C")
+        self.rebuild({third})
+        self.assertIn("<h1>C</h1>", self.read("c", "index.html"))
+        self.assertNotIn(second, self.builder.page_info_cache)
+
+    def test_fingerprint_rebuild(self):
+        self.write("content/index.md", "# Home\n\n![logo](/style.css)")
+        self.write("template.html", '<link href="/style.css" />{{ Content }}')
+        self.builder.fingerprint = True
+        self.build()
+        first = self.read("index.html")
+        self.assertRegex(first, r'href="/style\.[0-9a-f]{12}\.css"')
+        self.assertRegex(first, r'src=/style\.[0-9a-f]{12}\.css')
+
+        style = self.write("static/style.css", "body { margin: 0 }")
+        affected = self.rebuild({style})
+        self.assertEqual(1, len(affected))
+        second = self.read("index.html")
+        self.assertNotEqual(first, second)
+        self.assertRegex(second, r'href="/style\.[0-9a-f]{12}\.css"')
+
+    def test_builders_keep_their_own_asset_urls(self):
+        source = self.write("content/index.md", "# Home\n\n![logo](/style.css)")
+        self.builder.fingerprint = True
+        self.build()
+        plain = Builder(Site(self.site.content_dir, self.site.template_path, os.path.join(self.dir, "plain")))
+        with redirect_stdout(io.StringIO()):
+            plain.build()
+        self.assertRegex(self.builder.render(source).decode(), r"src=/style\.[0-9a-f]{12}\.css")
+        self.assertIn(b"src=/style.css", plain.render(source))
+
+
+if __name__ == "__main__":
+    unittest.main()
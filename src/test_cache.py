@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+from cache import BlockCache
+from common import markdown_to_htmlnode
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = BlockCache()
+        self.assertIsNone(cache.get(("PARAGRAPH", "/", "text")))
+        cache.put(("PARAGRAPH", "/", "text"), "<p>text</p>")
+        self.assertEqual(cache.get(("PARAGRAPH", "/", "text")), "<p>text</p>")
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.hit_rate(), 0.5)
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(max_entries=2)
+        cache.put(("PARAGRAPH", "/", "a"), "<p>a</p>")
+        cache.put(("PARAGRAPH", "/", "b"), "<p>b</p>")
+        cache.get(("PARAGRAPH", "/", "a"))
+        cache.put(("PARAGRAPH", "/", "c"), "<p>c</p>")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(("PARAGRAPH", "/", "b")))
+        self.assertEqual(cache.get(("PARAGRAPH", "/", "a")), "<p>a</p>")
+
+    def test_byte_limit(self):
+        cache = BlockCache(max_bytes=20)
+        cache.put(("PARAGRAPH", "/", "a"), "<p>a</p>")
+        cache.put(("PARAGRAPH", "/", "b"), "<p>b</p>")
+        cache.put(("PARAGRAPH", "/", "c"), "<p>c</p>")
+        self.assertLessEqual(cache.size, 20)
+        self.assertEqual(len(cache), 2)
+
+    def test_record_and_merge_new_entries(self):
+        worker = BlockCache()
+        worker.put(("PARAGRAPH", "/", "a"), "<p>a</p>")
+        self.assertIsNone(worker.new_entries)
+        self.assertEqual(worker.take_new(), ([], 0, 0))
+        worker.record_new()
+        worker.get(("PARAGRAPH", "/", "a"))
+        worker.put(("PARAGRAPH", "/", "b"), "<p>b</p>")
+        parent = BlockCache()
+        parent.merge(*worker.take_new())
+        self.assertEqual(list(parent.entries), [("PARAGRAPH", "/", "b")])
+        self.assertEqual((parent.hits, parent.misses), (1, 0))
+        self.assertEqual(worker.take_new(), ([], 0, 0))
+
+    def test_markdown_to_htmlnode_uses_cache(self):
+        cache = BlockCache()
+        md = "# Title\n\nShared **footer**"
+        first = markdown_to_htmlnode(md, "/", cache).to_html()
+        second = markdown_to_htmlnode(md, "/", cache).to_html()
+        self.assertEqual(first, markdown_to_htmlnode(md).to_html())
+        self.assertEqual(first, second)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 2)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "cache", "blocks.json")
+            cache = BlockCache()
+            cache.put(("PARAGRAPH", "/", "a"), "<p>a</p>")
+            cache.save(cache_path)
+            loaded = BlockCache()
+            loaded.load(cache_path)
+            self.assertEqual(loaded.get(("PARAGRAPH", "/", "a")), "<p>a</p>")
+
+    def test_load_ignores_other_versions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "blocks.json")
+            cache = BlockCache(version="old")
+            cache.put(("PARAGRAPH", "/", "a"), "<p>a</p>")
+            cache.save(cache_path)
+            loaded = BlockCache(version="new")
+            loaded.load(cache_path)
+            self.assertEqual(len(loaded), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from frontmatter import split_front_matter, read_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\nBody"), ({}, "# Title\n\nBody"))
+
+    def test_front_matter(self):
+        md = """---
+title: "Why Tom Bombadil Was a Mistake"
+date: 2024-05-01
+tags: [tolkien, opinion]
+draft: false
+authors:
+  - Archmage
+  - 'Second Author'
+---
+# Heading
+
+Body"""
+        metadata, body = split_front_matter(md)
+        self.assertEqual(
+            metadata,
+            {
+                "title": "Why Tom Bombadil Was a Mistake",
+                "date": "2024-05-01",
+                "tags": ["tolkien", "opinion"],
+                "draft": False,
+                "authors": ["Archmage", "Second Author"],
+            })
+        self.assertEqual(body, "# Heading\n\nBody")
+
+    def test_unclosed_front_matter(self):
+        md = "---\ntitle: Never closed\n# Heading"
+        self.assertEqual(split_front_matter(md), ({}, md))
+
+    def test_invalid_front_matter(self):
+        with self.assertRaises(Exception):
+            split_front_matter("---\nnot a key value\n---\n# Heading")
+
+    def test_read_front_matter(self):
+        metadata, lines = read_front_matter(iter(["---", "title: Streamed", "---", "# Heading", "Body"]))
+        self.assertEqual(metadata, {"title": "Streamed"})
+        self.assertEqual(list(lines), ["# Heading", "Body"])
+        metadata, lines = read_front_matter(iter(["# Heading", "Body"]))
+        self.assertEqual(metadata, {})
+        self.assertEqual(list(lines), ["# Heading", "Body"])
+
+    def test_indented_fence_is_not_front_matter(self):
+        md = " ---\ntitle: X\n---\n# Heading"
+        self.assertEqual(split_front_matter(md), ({}, md))
+        metadata, lines = read_front_matter(iter(md.split("\n")))
+        self.assertEqual(metadata, {})
+        self.assertEqual("\n".join(lines), md)
+
+
+if __name__ == "__main__":
+    unittest.main()
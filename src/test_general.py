@@ -4,7 +4,10 @@ from textnode import TextNode, TextType
 from htmlnode import HTMLNode, LeafNode, ParentNode
 from common import (text_node_to_html_node, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, 
                     split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, markdown_to_htmlnode)
-from blocktype import BlockType, block_to_blocktype
+from blocktype import BlockType, Block, block_to_blocktype, parse_blocks, iter_blocks, get_header_number
+from common import extract_title, extract_title_from_lines, register_block, BLOCK_RENDERERS
+from blocktype import BLOCK_RULES
+from cache import BlockCache
 
 class TestGeneral(unittest.TestCase):
     def test_text(self):
@@ -226,3 +229,161 @@ This is another paragraph with _italic_ text and `code` here
             html,
             "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p><blockquote>This is a quote block of something important</blockquote><ol><li>This</li><li>List</li><li>Is</li><li>Ordered</li></ol><p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
         )
+
+    def test_text_to_textnodes_nesting(self):
+        text = "`a **b** c` and **bold _not italic_** and an unmatched ** here"
+        new_nodes = text_to_textnodes(text)
+        self.assertListEqual(
+            [
+                TextNode("a **b** c", TextType.CODE),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("bold _not italic_", TextType.BOLD),
+                TextNode(" and an unmatched ** here", TextType.TEXT),
+            ],
+            new_nodes)
+
+    def test_text_to_textnodes_links(self):
+        text = "[first](/a)[second](/b) then ![img](/c.png) and [unclosed"
+        new_nodes = text_to_textnodes(text)
+        self.assertListEqual(
+            [
+                TextNode("first", TextType.LINK, "/a"),
+                TextNode("second", TextType.LINK, "/b"),
+                TextNode(" then ", TextType.TEXT),
+                TextNode("img", TextType.IMAGE, "/c.png"),
+                TextNode(" and [unclosed", TextType.TEXT),
+            ],
+            new_nodes)
+
+    def test_text_to_textnodes_many_links(self):
+        text = " ".join(f"[link {i}](/page/{i})" for i in range(1000))
+        new_nodes = text_to_textnodes(text)
+        self.assertEqual(len(new_nodes), 1999)
+        self.assertEqual(new_nodes[-1], TextNode("link 999", TextType.LINK, "/page/999"))
+
+    def test_parse_blocks(self):
+        md = """
+## Heading
+
+```
+first line
+
+after a blank line
+```
+- one
+- two
+
+  trailing paragraph   
+"""
+        self.assertListEqual(
+            [
+                Block(BlockType.HEADING, ["## Heading"]),
+                Block(BlockType.CODE, ["```", "first line", "", "after a blank line", "```"]),
+                Block(BlockType.UNORDERED_LIST, ["- one", "- two"]),
+                Block(BlockType.PARAGRAPH, ["trailing paragraph"]),
+            ],
+            parse_blocks(md))
+
+    def test_codeblock_with_blank_lines(self):
+        md = """
+```
+def main():
+
+    return 1
+```
+"""
+        node = markdown_to_htmlnode(md)
+        self.assertEqual(node.to_html(), "<div><pre><code>def main():\n\n    return 1\n</code></pre></div>")
+
+    def test_header_number(self):
+        self.assertEqual(get_header_number("# C# rocks"), 1)
+        self.assertEqual(get_header_number("###### Six"), 6)
+
+    def test_split_links_without_empty_nodes(self):
+        node = TextNode("[first](/a) then a longer trailing sentence after the link", TextType.TEXT)
+        self.assertListEqual(
+            [
+                TextNode("first", TextType.LINK, "/a"),
+                TextNode(" then a longer trailing sentence after the link", TextType.TEXT),
+            ],
+            split_nodes_link([node]))
+
+    def test_delimiter_without_empty_nodes(self):
+        node = TextNode("**bold** start", TextType.TEXT)
+        self.assertListEqual(
+            [TextNode("bold", TextType.BOLD), TextNode(" start", TextType.TEXT)],
+            split_nodes_delimiter([node], "**", TextType.BOLD))
+
+    def test_split_empty_text(self):
+        nodes = split_nodes_delimiter([TextNode("", TextType.TEXT)], "**", TextType.BOLD)
+        self.assertListEqual([TextNode("", TextType.TEXT)], nodes)
+        self.assertListEqual(nodes, split_nodes_link(split_nodes_image(split_nodes_delimiter(nodes, "_", TextType.ITALIC))))
+
+    def test_iter_blocks_is_lazy(self):
+        def lines():
+            yield "# Heading"
+            yield ""
+            yield "paragraph"
+            raise AssertionError("read past the second block")
+        blocks = iter_blocks(lines())
+        self.assertEqual(next(blocks), Block(BlockType.HEADING, ["# Heading"]))
+
+    def test_extract_title_from_lines(self):
+        for md in ("# Title", "Intro\n\n# Title ##\n\n## Sub"):
+            self.assertEqual(extract_title(md), "Title")
+            self.assertEqual(extract_title_from_lines(md.splitlines()), "Title")
+        for md in ("Intro text\n## Sub\n# Title", "No heading"):
+            with self.assertRaises(Exception):
+                extract_title(md)
+            with self.assertRaises(Exception):
+                extract_title_from_lines(md.splitlines())
+
+    def test_plain_text_fast_path(self):
+        self.assertListEqual([TextNode("Plain prose, no markup!", TextType.TEXT)], text_to_textnodes("Plain prose, no markup!"))
+        self.assertListEqual([], text_to_textnodes(""))
+        node = markdown_to_htmlnode("Just some prose\nover two lines.\n\n> A plain quote")
+        self.assertEqual(node.to_html(), "<div><p>Just some prose over two lines.</p><blockquote>A plain quote</blockquote></div>")
+        self.assertEqual(node.children[0].children[0].tag, None)
+        self.assertEqual(len(node.children[0].children), 1)
+
+    def test_strikethrough(self):
+        self.assertListEqual(
+            [TextNode("Not ", TextType.TEXT), TextNode("Legolas", TextType.STRIKETHROUGH), TextNode(" ~Glorfindel~", TextType.TEXT)],
+            text_to_textnodes("Not ~~Legolas~~ ~Glorfindel~"))
+        self.assertEqual(markdown_to_htmlnode("~~gone~~").to_html(), "<div><p><del>gone</del></p></div>")
+        self.assertListEqual(
+            [TextNode("a ", TextType.TEXT), TextNode("b", TextType.STRIKETHROUGH)],
+            split_nodes_delimiter([TextNode("a ~~b~~", TextType.TEXT)], "~~", TextType.STRIKETHROUGH))
+
+    def test_table_blocktype(self):
+        self.assertEqual(block_to_blocktype("| a | b |\n|---|:-:|\n| 1 | 2 |"), BlockType.TABLE)
+        self.assertEqual(block_to_blocktype("| a | b |\n| 1 | 2 |"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_blocktype("| a | b |"), BlockType.PARAGRAPH)
+
+    def test_table(self):
+        md = "| Name | Age |\n|:-----|---:|\n| **Frodo** | 50 |\n| Sam \\| Samwise |"
+        self.assertEqual(
+            markdown_to_htmlnode(md).to_html(),
+            "<div><table><thead><tr><th align=left>Name</th><th align=right>Age</th></tr></thead>"
+            "<tbody><tr><td align=left><b>Frodo</b></td><td align=right>50</td></tr>"
+            "<tr><td align=left>Sam | Samwise</td><td align=right></td></tr></tbody></table></div>")
+        self.assertEqual(
+            markdown_to_htmlnode("| a |\n| - |").to_html(),
+            "<div><table><thead><tr><th>a</th></tr></thead></table></div>")
+
+    def test_register_block(self):
+        def is_note(lines):
+            return lines[0].startswith("!!! ")
+
+        def note_to_html(lines, basepath="/"):
+            return ParentNode("aside", [LeafNode(None, " ".join(lines)[4:])])
+
+        register_block("NOTE", note_to_html, "!", is_note)
+        try:
+            self.assertEqual(block_to_blocktype("!!! Beware"), "NOTE")
+            self.assertEqual(block_to_blocktype("!Not a note"), BlockType.PARAGRAPH)
+            self.assertEqual(markdown_to_htmlnode("!!! Beware\nthe Balrog").to_html(), "<div><aside>Beware the Balrog</aside></div>")
+            self.assertEqual(markdown_to_htmlnode("!!! Cached", cache=BlockCache()).to_html(), "<div><aside>Cached</aside></div>")
+        finally:
+            del BLOCK_RULES["!"]
+            del BLOCK_RENDERERS["NOTE"]
@@ -0,0 +1,62 @@
+import os
+import unittest
+
+from generate import collect_pages, generate_pages, render_page, stream_page
+from fixtures import TempDirTestCase
+
+
+class TestGenerate(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.dir, "content")
+        self.docs = os.path.join(self.dir, "docs")
+        self.template = self.write("template.html", "<title>{{ Title }}</title><article>{{ Content }}</article>")
+
+    def test_collect_pages(self):
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/post/index.md", "# Post")
+        self.write("content/notes.txt", "not markdown")
+        self.assertListEqual(
+            [
+                (os.path.join(self.content, "blog", "post", "index.md"), os.path.join(self.docs, "blog", "post", "index.html")),
+                (os.path.join(self.content, "index.md"), os.path.join(self.docs, "index.html")),
+            ],
+            collect_pages(self.content, self.docs))
+
+    def test_generate_pages_parallel(self):
+        for i in range(4):
+            self.write(f"content/page{i}/index.md", f"# Page {i}\n\nSome **bold** text")
+        pages = collect_pages(self.content, self.docs)
+        generate_pages(pages, self.template, "/", jobs=2)
+        for i, (_, dest_path) in enumerate(pages):
+            self.assertEqual(
+                self.read(dest_path),
+                f"<title>Page {i}</title><article><div><h1>Page {i}</h1><p>Some <b>bold</b> text</p></div></article>")
+
+    def test_generate_pages_parallel_error(self):
+        self.write("content/good/index.md", "# Good")
+        self.write("content/bad/index.md", "no title here")
+        pages = collect_pages(self.content, self.docs)
+        with self.assertRaises(Exception) as context:
+            generate_pages(pages, self.template, "/", jobs=2)
+        self.assertIn("bad", str(context.exception))
+
+    def test_generate_page_front_matter(self):
+        self.template = self.write("template.html", "<title>{{ Title }}</title><p>{{ Author }}</p>{{ Content }}")
+        self.write("content/index.md", "---\ntitle: Front matter title\nauthor: Tolkien\n---\n# Heading")
+        pages = collect_pages(self.content, self.docs)
+        generate_pages(pages, self.template, "/")
+        self.assertEqual(
+            self.read(os.path.join(self.docs, "index.html")),
+            "<title>Front matter title</title><p>Tolkien</p><div><h1>Heading</h1></div>")
+
+    def test_stream_page_matches_render_page(self):
+        source = self.write("content/index.md", "---\nauthor: Tolkien\n---\nIntro\n\n# Title\n\n```\ncode\n\nmore code\n```\n\n- a [link](/a)\n- b")
+        dest_path = os.path.join(self.docs, "index.html")
+        stream_page(source, self.template, dest_path, "/site/")
+        self.assertEqual(self.read(dest_path).encode("utf-8"), render_page(source, self.template, "/site/"))
+        self.assertFalse(os.path.exists(f"{dest_path}.tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
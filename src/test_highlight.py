@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import highlight
+from cache import BlockCache
+from common import markdown_to_htmlnode
+from highlight import canonical_language, highlight_cache, highlight_code, tokenize_code
+
+
+class TestHighlight(unittest.TestCase):
+    def setUp(self):
+        highlight_cache.clear()
+        highlight_cache.hits = highlight_cache.misses = 0
+
+    def test_tokenize_python(self):
+        self.assertEqual(
+            tokenize_code('def f(x):\n    return "a<b"  # done\n', "python"),
+            '<span class="k">def</span> f(x):\n    <span class="k">return</span> '
+            '<span class="s">"a&lt;b"</span>  <span class="c1"># done</span>\n',
+        )
+
+    def test_tokenize_names_and_numbers(self):
+        self.assertEqual(
+            tokenize_code("let n = Math.max(0x1f, null);", "javascript"),
+            '<span class="k">let</span> n = <span class="nb">Math</span>.max(<span class="m">0x1f</span>, '
+            '<span class="kc">null</span>);',
+        )
+
+    def test_tokenize_block_comment_and_case_insensitive_keywords(self):
+        self.assertEqual(
+            tokenize_code("/* all */ Select a FROM t", "sql"),
+            '<span class="c">/* all */</span> <span class="k">Select</span> a <span class="k">FROM</span> t',
+        )
+
+    def test_aliases(self):
+        self.assertEqual(canonical_language("PY"), "python")
+        self.assertEqual(canonical_language("sh"), "bash")
+        self.assertEqual(canonical_language("haskell"), "haskell")
+
+    def test_unknown_language(self):
+        self.assertIsNone(highlight_code("x", "no-such-language"))
+
+    def test_highlight_is_cached(self):
+        first = highlight.highlight("x = 1\n", "py")
+        second = highlight.highlight("x = 1\n", "python")
+        self.assertEqual(first, second)
+        self.assertEqual((highlight_cache.hits, highlight_cache.misses), (1, 1))
+        self.assertIsNone(highlight_cache.new_entries)
+
+    def test_cache_keys_include_highlighter_version(self):
+        highlight.highlight("x = 1", "python")
+        (language, digest, version), = highlight_cache.entries
+        self.assertEqual((language, len(digest), version), ("python", 64, highlight.HIGHLIGHTER_VERSION))
+
+    def test_cache_survives_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "highlight.json")
+            highlighted = highlight.highlight("echo hi", "bash")
+            highlight_cache.save(cache_path)
+            loaded = BlockCache()
+            loaded.load(cache_path)
+            self.assertEqual(list(loaded.entries.values()), [highlighted])
+
+    def test_code_block_language(self):
+        html = markdown_to_htmlnode("```python\nx = 1\n```").to_html()
+        highlighted = highlight.highlight("x = 1\n", "python")
+        self.assertEqual(html, f"<div><pre><code class=language-python>{highlighted}</code></pre></div>")
+        self.assertNotIn("python\n", html)
+
+    def test_code_block_unknown_language(self):
+        self.assertEqual(
+            markdown_to_htmlnode("```no-such-language\nx = 1\n```").to_html(),
+            "<div><pre><code class=language-no-such-language>x = 1\n</code></pre></div>",
+        )
+
+    def test_code_block_without_language_is_unchanged(self):
+        self.assertEqual(markdown_to_htmlnode("```\nx = 1\n```").to_html(), "<div><pre><code>x = 1\n</code></pre></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -33,5 +33,22 @@ class TestHTMLNode(unittest.TestCase):
         parent_node = ParentNode("div", [child_node])
         self.assertEqual(parent_node.to_html(), "<div><span><b>grandchild</b></span></div>",)
 
+    def test_write_html_streams_chunks(self):
+        parent_node = ParentNode("ul", [ParentNode("li", [LeafNode(None, "item "), LeafNode("b", "one")]), ParentNode("li", [LeafNode("a", "two", {"href": "/two"})])])
+        chunks = []
+        parent_node.write_html(chunks.append)
+        self.assertEqual(chunks, ["<ul>", "<li>", "item ", "<b>one</b>", "</li>", "<li>", "<a href=/two>two</a>", "</li>", "</ul>"])
+        self.assertEqual(parent_node.to_html(), "".join(chunks))
+
+    def test_to_html_wide_tree(self):
+        parent_node = ParentNode("ol", [ParentNode("li", [LeafNode(None, str(i))]) for i in range(10000)])
+        html = parent_node.to_html()
+        self.assertTrue(html.startswith("<ol><li>0</li><li>1</li>"))
+        self.assertTrue(html.endswith("<li>9999</li></ol>"))
+
+    def test_slots(self):
+        for node in (HTMLNode("p"), LeafNode("b", "bold"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+import os
+import unittest
+
+from links import LinkGraph, extract_page_links, output_targets, target_key
+from fixtures import TempDirTestCase
+
+
+class TestLinks(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.docs = os.path.join(self.tmp.name, "docs")
+
+    def page(self, name, text):
+        source = self.write(os.path.join(self.content, name, "index.md"), text)
+        dest = self.write(os.path.join(self.docs, name, "index.html"), "")
+        return source, dest
+
+    def test_extract_page_links(self):
+        markdown = "[home](/) and ![logo](/images/logo.png)\n\n```\n[not a link](/code)\n```\n\n[next](../next/)"
+        self.assertListEqual(["/", "/images/logo.png", "../next/"], extract_page_links(markdown))
+
+    def test_extract_page_links_skips_inline_code(self):
+        self.assertListEqual([], extract_page_links("Use `[text](/missing)` syntax"))
+        self.assertListEqual(["/found"], extract_page_links("- `[text](/missing)` or [this](/found)"))
+
+    def test_target_key(self):
+        self.assertEqual("", target_key("/", "/blog/post/"))
+        self.assertEqual("blog/post", target_key("/blog/post/", "/"))
+        self.assertEqual("blog/post", target_key("/blog/post/index.html#top", "/"))
+        self.assertEqual("blog/next", target_key("../next/", "/blog/post/"))
+        self.assertEqual("blog/post/logo.png", target_key("logo.png", "/blog/post/"))
+        self.assertIsNone(target_key("https://boot.dev", "/"))
+        self.assertIsNone(target_key("mailto:frodo@shire.me", "/"))
+        self.assertIsNone(target_key("#section", "/"))
+
+    def test_output_targets(self):
+        self.write(os.path.join(self.docs, "index.html"), "")
+        self.write(os.path.join(self.docs, "blog", "post", "index.html"), "")
+        self.write(os.path.join(self.docs, "index.css"), "")
+        self.assertSetEqual({"", "blog/post", "index.css"}, output_targets(self.docs))
+
+    def test_incremental_check(self):
+        home = self.page("", "[a](/a/) [b](/b/) ![img](/missing.png)")
+        a = self.page("a", "[home](/)")
+        b = self.page("b", "[a](../a/)")
+        graph = LinkGraph()
+        graph.update_pages([home, a, b], self.docs)
+        self.assertSetEqual({home[0], a[0], b[0]}, graph.check(output_targets(self.docs)))
+        self.assertListEqual([(home[0], "/missing.png")], graph.broken_links())
+
+        graph.update_pages([home, a, b], self.docs)
+        self.assertSetEqual(set(), graph.check(output_targets(self.docs)))
+
+        os.remove(a[1])
+        os.rmdir(os.path.dirname(a[1]))
+        graph.update_pages([home, b], self.docs)
+        self.assertSetEqual({home[0], b[0]}, graph.check(output_targets(self.docs)))
+        self.assertListEqual([(b[0], "../a/"), (home[0], "/a/"), (home[0], "/missing.png")], graph.broken_links())
+
+        graph_path = os.path.join(self.tmp.name, ".cache", "links.json")
+        graph.save(graph_path)
+        loaded = LinkGraph()
+        loaded.load(graph_path)
+        loaded.update_pages([home, b], self.docs)
+        self.assertSetEqual(set(), loaded.check(output_targets(self.docs)))
+        self.assertListEqual(graph.broken_links(), loaded.broken_links())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import unittest
+
+from manifest import hash_file, load_manifest, save_manifest, manifest_entry, is_page_current, remove_stale_outputs
+from fixtures import TempDirTestCase
+
+
+class TestManifest(TempDirTestCase):
+    def test_load_missing_manifest(self):
+        self.assertEqual(load_manifest(os.path.join(self.dir, "missing.json")), {"pages": {}})
+
+    def test_load_corrupt_manifest(self):
+        path = self.write("manifest.json", "{not json")
+        self.assertEqual(load_manifest(path), {"pages": {}})
+
+    def test_save_and_load_roundtrip(self):
+        path = os.path.join(self.dir, ".cache", "manifest.json")
+        manifest = {"pages": {"docs/index.html": manifest_entry("content/index.md", "abc", "def", "/")}}
+        save_manifest(path, manifest)
+        self.assertEqual(load_manifest(path), manifest)
+
+    def test_page_current(self):
+        source = self.write("index.md", "# Title")
+        dest = self.write("index.html", "<h1>Title</h1>")
+        entry = manifest_entry(source, hash_file(source), "template", "/")
+        manifest = {"pages": {dest: entry}}
+        self.assertTrue(is_page_current(manifest, dest, entry))
+        self.assertFalse(is_page_current(manifest, dest, manifest_entry(source, "changed", "template", "/")))
+        self.assertFalse(is_page_current(manifest, dest, manifest_entry(source, hash_file(source), "changed", "/")))
+        self.assertFalse(is_page_current(manifest, dest, manifest_entry(source, hash_file(source), "template", "/blog/")))
+        os.remove(dest)
+        self.assertFalse(is_page_current(manifest, dest, entry))
+
+    def test_remove_stale_outputs(self):
+        kept = self.write("docs/index.html", "kept")
+        stale = self.write("docs/old/index.html", "stale")
+        old_manifest = {"pages": {kept: {}, stale: {}}}
+        new_manifest = {"pages": {kept: {}}}
+        self.assertEqual(remove_stale_outputs(old_manifest, new_manifest), [stale])
+        self.assertTrue(os.path.exists(kept))
+        self.assertFalse(os.path.exists(os.path.dirname(stale)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import gzip
+import os
+import unittest
+
+from postprocess import minify_css, minify_html, postprocess_directory
+from fixtures import TempDirTestCase
+
+
+class TestPostprocess(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dir = os.path.join(self.tmp.name, "docs")
+        self.state_path = os.path.join(self.tmp.name, ".cache", "postprocess.json")
+
+    def test_minify_html(self):
+        html = "<html>\n  <head>\n    <title>Home</title>\n  </head>\n  <body><pre><code>a\n    b\n</code></pre>\n\n<p>x   y</p></body>\n</html>\n"
+        self.assertEqual(
+            "<html> <head> <title>Home</title> </head> <body><pre><code>a\n    b\n</code></pre> <p>x y</p></body> </html>",
+            minify_html(html))
+
+    def test_minify_html_preserves_script(self):
+        html = "<p>a</p>\n<script>\n// comment\nvar a = 1;\n</script>\n<PRE>x\n y</PRE>"
+        self.assertEqual("<p>a</p> <script>\n// comment\nvar a = 1;\n</script> <PRE>x\n y</PRE>", minify_html(html))
+
+    def test_minify_css(self):
+        css = "/* theme */\nbody {\n  color: #fff;\n  margin: 0 auto;\n}\n\nh1,\nh2 > a {\n  color: red;\n}\n"
+        self.assertEqual("body{color:#fff;margin:0 auto}h1,h2>a{color:red}", minify_css(css))
+
+    def test_minify_css_preserves_strings(self):
+        css = 'li::after {\n  content: ", ";\n}\np {\n  content: "a; b: c /* x */";\n  font-family: \'A , B\', serif; /* "q" */\n}'
+        self.assertEqual('li::after{content:", "}p{content:"a; b: c /* x */";font-family:\'A , B\',serif}', minify_css(css))
+        self.assertEqual(minify_css(css), minify_css(minify_css(css)))
+
+    def test_postprocess_directory(self):
+        self.write("index.html", "<p>\n  hello\n</p>")
+        self.write("index.css", "body {\n  margin: 0;\n}")
+        self.write("images/logo.png", "png")
+        processed, _ = postprocess_directory(self.dir, self.state_path)
+        self.assertEqual(["index.css", "index.html"], sorted(processed))
+        self.assertEqual("<p> hello </p>", self.read("index.html"))
+        with gzip.open(os.path.join(self.dir, "index.css.gz"), 'rb') as f:
+            self.assertEqual(b"body{margin:0}", f.read())
+        self.assertFalse(os.path.exists(os.path.join(self.dir, "images", "logo.png.gz")))
+
+        processed, _ = postprocess_directory(self.dir, self.state_path)
+        self.assertEqual([], processed)
+
+        self.write("index.html", "<p>\n\n  hello\n</p>")
+        processed, _ = postprocess_directory(self.dir, self.state_path)
+        self.assertEqual([], processed)
+        self.assertEqual("<p> hello </p>", self.read("index.html"))
+
+        self.write("index.html", "<p>changed text</p>")
+        processed, _ = postprocess_directory(self.dir, self.state_path, jobs=2)
+        self.assertEqual(["index.html"], processed)
+
+        os.remove(os.path.join(self.dir, "index.css"))
+        _, removed = postprocess_directory(self.dir, self.state_path)
+        self.assertEqual([os.path.join(self.dir, "index.css.gz")], removed)
+
+
+if __name__ == "__main__":
+    unittest.main()
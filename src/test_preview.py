@@ -0,0 +1,102 @@
+import os
+import unittest
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from builder import Site
+from preview import RenderCache, etag_matches, resolve_source, start_preview_server, strip_basepath
+from fixtures import TempDirTestCase
+
+
+class TestPreview(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.dir, "content")
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("static/style.css", "body {}")
+
+    def start(self, basepath="/", max_bytes=1024 * 1024):
+        server = start_preview_server(Site.from_root(self.dir, basepath), 0, max_bytes)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server, f"http://localhost:{server.server_address[1]}"
+
+    def fetch(self, url, etag=None):
+        request = Request(url)
+        if etag is not None:
+            request.add_header("If-None-Match", etag)
+        try:
+            with urlopen(request) as response:
+                return response.status, response.headers, response.read()
+        except HTTPError as e:
+            return e.code, e.headers, b""
+
+    def test_render_cache_lru(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put("a", 1, b"aaaa")
+        cache.put("b", 1, b"bbbb")
+        self.assertEqual(b"aaaa", cache.get("a", 1)[0])
+        cache.put("c", 1, b"cccc")
+        self.assertIsNone(cache.get("b", 1))
+        self.assertIsNotNone(cache.get("a", 1))
+        self.assertEqual(8, cache.size)
+
+    def test_render_cache_stamp(self):
+        cache = RenderCache()
+        cache.put("a", (1, 4), b"aaaa")
+        self.assertIsNone(cache.get("a", (2, 4)))
+        cache.put("big", 1, b"x" * (cache.max_bytes + 1))
+        self.assertEqual(1, len(cache))
+
+    def test_resolve_source(self):
+        index = self.write("content/index.md", "# Home")
+        post = self.write("content/blog/post/index.md", "# Post")
+        self.assertEqual(index, resolve_source("/", self.content))
+        self.assertEqual(post, resolve_source("/blog/post/", self.content))
+        self.assertEqual(post, resolve_source("/blog/post/index.html", self.content))
+        self.assertIsNone(resolve_source("/blog/", self.content))
+        self.assertIsNone(resolve_source("/style.css", self.content))
+        self.assertIsNone(resolve_source("/../content/index.html", os.path.join(self.content, "blog")))
+        self.assertEqual("/blog/", strip_basepath("/site/blog/?q=1", "/site/"))
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(etag_matches('W/"b"', '"b"'))
+        self.assertTrue(etag_matches("*", '"b"'))
+        self.assertFalse(etag_matches(None, '"b"'))
+
+    def test_serve_page(self):
+        source = self.write("content/blog/post/index.md", "# Post\n\n[home](/)")
+        server, url = self.start("/site/")
+        status, headers, body = self.fetch(f"{url}/site/blog/post/")
+        self.assertEqual(200, status)
+        self.assertEqual(b'<title>Post</title><div><h1>Post</h1><p><a href=/site/>home</a></p></div>', body)
+        status, _, _ = self.fetch(f"{url}/site/blog/post/", headers["ETag"])
+        self.assertEqual(304, status)
+        self.assertEqual(1, server.preview.cache.hits)
+
+        self.write("content/blog/post/index.md", "# Changed")
+        os.utime(source, ns=(0, 0))
+        status, _, body = self.fetch(f"{url}/site/blog/post/", headers["ETag"])
+        self.assertEqual(200, status)
+        self.assertIn(b"<h1>Changed</h1>", body)
+
+        status, _, _ = self.fetch(f"{url}/site/missing/")
+        self.assertEqual(404, status)
+
+    def test_serve_static(self):
+        self.write("content/blog/post/index.md", "# Post")
+        _, url = self.start()
+        status, headers, body = self.fetch(f"{url}/style.css")
+        self.assertEqual(200, status)
+        self.assertEqual(b"body {}", body)
+        self.assertEqual("text/css", headers["Content-Type"])
+        status, _, _ = self.fetch(f"{url}/style.css", headers["ETag"])
+        self.assertEqual(304, status)
+        status, _, body = self.fetch(f"{url}/blog/post")
+        self.assertEqual(200, status)
+        self.assertIn(b"<h1>Post</h1>", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
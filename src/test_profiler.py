@@ -0,0 +1,47 @@
+import unittest
+
+from profiler import BuildProfiler, profile_stage
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def test_stage_records_event(self):
+        profiler = BuildProfiler()
+        with profiler.stage("read", "index.md"):
+            [str(i) for i in range(100)]
+        self.assertEqual(len(profiler.events), 1)
+        self.assertEqual(profiler.events[0]["stage"], "read")
+        self.assertEqual(profiler.events[0]["page"], "index.md")
+        self.assertGreaterEqual(profiler.events[0]["duration_ns"], 0)
+
+    def test_profile_stage_without_profiler(self):
+        with profile_stage(None, "read"):
+            pass
+
+    def test_totals_and_report(self):
+        profiler = BuildProfiler()
+        other = BuildProfiler()
+        with profiler.stage("static copy"):
+            pass
+        with profiler.stage("read", "a.md"):
+            pass
+        with other.stage("read", "b.md"):
+            pass
+        profiler.merge(other)
+        self.assertEqual(profiler.stage_totals()["read"]["count"], 2)
+        self.assertEqual(set(profiler.page_totals()), {"a.md", "b.md"})
+        report = profiler.report()
+        self.assertIn("static copy", report)
+        self.assertIn("Slowest pages", report)
+
+    def test_trace_events(self):
+        profiler = BuildProfiler()
+        with profiler.stage("write", "a.md"):
+            pass
+        events = profiler.trace_events()
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["ts"], 0)
+        self.assertEqual(events[0]["args"]["page"], "a.md")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import unittest
+
+from search import SearchIndex, assign_shards, extract_page_text, shard_file_name, term_positions, tokenize
+from fixtures import TempDirTestCase
+
+
+class TestSearch(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.dir, "content")
+        self.docs = os.path.join(self.dir, "docs")
+
+    def page(self, name, text):
+        source = self.write(os.path.join(self.content, name, "index.md"), text)
+        return source, os.path.join(self.docs, name, "index.html")
+
+    def read_json(self, *parts):
+        with open(os.path.join(self.docs, "search", *parts), 'r') as f:
+            return json.load(f)
+
+    def test_extract_page_text(self):
+        markdown = "# The **Shire**\n\n> Not all who _wander_\n\n- [Bree](/bree) ![map](/map.png)\n\n```\nskipped code\n```"
+        self.assertEqual("The Shire Not all who wander Bree", " ".join(extract_page_text(markdown).split()))
+
+    def test_term_positions(self):
+        self.assertEqual({"a": [0, 2], "ring": [1]}, term_positions(tokenize("A ring, a")))
+
+    def test_assign_shards(self):
+        terms = ["ring", "rivendell", "road", "shire"]
+        sizes = dict.fromkeys(terms, 10)
+        self.assertEqual({"r": ["ring", "rivendell", "road"], "s": ["shire"]}, assign_shards(terms, sizes, 30))
+        self.assertEqual({"ri": ["ring", "rivendell"], "ro": ["road"], "s": ["shire"]}, assign_shards(terms, sizes, 20))
+        self.assertEqual("_e9_t.json", shard_file_name("ét"))
+
+    def test_write_and_update(self):
+        shire = self.page("shire", "# Shire\n\nThe ring left the shire")
+        bree = self.page("bree", "# Bree\n\nThe pony at bree")
+        index = SearchIndex(max_shard_bytes=1)
+        index.update_pages([shire, bree], self.docs)
+        index.write(self.docs)
+        manifest = self.read_json("index.json")
+        self.assertEqual({"0": ["/shire/", "Shire"], "1": ["/bree/", "Bree"]}, manifest["pages"])
+        self.assertEqual("s.json", manifest["shards"]["s"])
+        self.assertEqual({"shire": [[0, 0, 5]]}, self.read_json("s.json"))
+        self.assertEqual([[0, 1, 3], [1, 1]], self.read_json("t.json")["the"])
+
+        self.assertEqual([], index.update_pages([shire, bree], self.docs))
+        self.assertEqual([], index.write(self.docs))
+
+        with open(bree[0], 'w') as f:
+            f.write("# Bree\n\nThe prancing pony")
+        self.assertEqual([bree[0]], index.update_pages([shire, bree], self.docs))
+        written = [os.path.basename(path) for path in index.write(self.docs)]
+        self.assertNotIn("s.json", written)
+        self.assertIn("pr.json", written)
+        self.assertEqual([[0, 1, 3], [1, 1]], self.read_json("t.json")["the"])
+
+        index.update_pages([shire], self.docs)
+        index.write(self.docs)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "search", "pr.json")))
+        self.assertEqual({"0": ["/shire/", "Shire"]}, self.read_json("index.json")["pages"])
+
+    def test_save_and_load(self):
+        shire = self.page("shire", "# Shire\n\nThe ring")
+        index = SearchIndex()
+        index.update_pages([shire], self.docs)
+        index.write(self.docs)
+        index_path = os.path.join(self.dir, ".cache", "search.json")
+        index.save(index_path)
+        loaded = SearchIndex()
+        loaded.load(index_path)
+        self.assertEqual([], loaded.update_pages([shire], self.docs))
+        self.assertEqual([], loaded.write(self.docs))
+        self.assertEqual(index.postings, loaded.postings)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+from builder import Site, Builder
+from shard import SHARD_MANIFEST, parse_shard, partition_pages, shard_of, verify_shards
+from fixtures import TempDirTestCase
+
+
+class TestShard(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", '<title>{{ Title }}</title><link href="/style.css" />{{ Content }}')
+        self.write("static/style.css", "body {}")
+        self.write("content/index.md", "# Home")
+        for i in range(6):
+            self.write(f"content/blog/post{i}/index.md", f"---\ndate: 2024-01-0{i + 1}\ntags: [elves]\n---\n# Post {i}\n\nText {i}")
+
+    def site(self, output):
+        return Site(os.path.join(self.dir, "content"), os.path.join(self.dir, "template.html"),
+                    os.path.join(self.dir, output), os.path.join(self.dir, "static"), "/site/", "https://example.com")
+
+    def read_tree(self, root):
+        files = {}
+        for dir_path, _, file_names in os.walk(root):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                with open(path, 'rb') as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def test_parse_shard(self):
+        self.assertEqual((2, 4), parse_shard("2/4"))
+        for value in ("0/4", "5/4", "1", "a/b"):
+            with self.assertRaises(Exception):
+                parse_shard(value)
+
+    def test_shard_of_is_stable(self):
+        self.assertEqual([4, 1, 2], [shard_of(path, 4) for path in ("index.md", "blog/tom/index.md", "contact/index.md")])
+
+    def test_partition_covers_every_page_once(self):
+        content = os.path.join(self.dir, "content")
+        pages = [(os.path.join(content, f"p{i}.md"), f"p{i}.html") for i in range(50)]
+        partitions = [partition_pages(pages, content, index, 3) for index in (1, 2, 3)]
+        self.assertEqual(sorted(pages), sorted(page for partition in partitions for page in partition))
+
+    def test_verify_shards(self):
+        page = {"page": {"source": "index.md"}}
+        one = ("one", {"shard": 1, "count": 1, "pages": {"index.html": page}})
+        self.assertEqual({"index.html": "one"}, verify_shards([one], ["index.html"]))
+        with self.assertRaises(Exception) as context:
+            verify_shards([one], ["index.html", "blog/index.html"])
+        self.assertIn("blog/index.html is missing", str(context.exception))
+        with self.assertRaises(Exception) as context:
+            verify_shards([one, ("two", {"shard": 2, "count": 2, "pages": {}})], ["index.html"])
+        self.assertIn("disagree", str(context.exception))
+
+    def test_merge_matches_full_build(self):
+        with redirect_stdout(io.StringIO()):
+            Builder(self.site("docs"), fingerprint=True).build()
+            shard_dirs = []
+            for index in (1, 2, 3):
+                site = self.site(os.path.join("shards", f"{index}-of-3"))
+                Builder(site, fingerprint=True).build_shard(index, 3)
+                shard_dirs.append(site.output_dir)
+            Builder(self.site("merged"), fingerprint=True).merge(shard_dirs)
+        shard_pages = [page for shard_dir in shard_dirs for page in self.read_tree(shard_dir) if page != SHARD_MANIFEST]
+        self.assertEqual(7, len(shard_pages))
+        self.assertEqual(self.read_tree(os.path.join(self.dir, "docs")), self.read_tree(os.path.join(self.dir, "merged")))
+
+    def test_merge_detects_modified_output(self):
+        with redirect_stdout(io.StringIO()):
+            site = self.site(os.path.join("shards", "1-of-1"))
+            Builder(site).build_shard(1, 1)
+            self.write(os.path.join("shards", "1-of-1", "index.html"), "tampered")
+            with self.assertRaises(Exception) as context:
+                Builder(self.site("merged")).merge([site.output_dir])
+        self.assertIn("does not match its manifest", str(context.exception))
+
+    def test_failed_merge_keeps_output(self):
+        with redirect_stdout(io.StringIO()):
+            shard_dirs = []
+            for index in (1, 2, 3):
+                site = self.site(os.path.join("shards", f"{index}-of-3"))
+                Builder(site).build_shard(index, 3)
+                shard_dirs.append(site.output_dir)
+            Builder(self.site("merged")).merge(shard_dirs)
+            before = self.read_tree(os.path.join(self.dir, "merged"))
+            with self.assertRaises(Exception) as context:
+                Builder(self.site("merged")).merge(shard_dirs[:2])
+        self.assertIn("Missing shard(s) 3/3", str(context.exception))
+        self.assertEqual(before, self.read_tree(os.path.join(self.dir, "merged")))
+
+
+if __name__ == "__main__":
+    unittest.main()
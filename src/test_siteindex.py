@@ -0,0 +1,77 @@
+import os
+import unittest
+
+from siteindex import page_url, extract_summary, read_page_info, generate_site_index, tag_slug
+from fixtures import TempDirTestCase
+
+
+class TestSiteIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.dir, "content")
+        self.docs = os.path.join(self.dir, "docs")
+        self.template = self.write("template.html", "<title>{{ Title }}</title><article>{{ Content }}</article>")
+
+    def page(self, relative_path, text):
+        from_path = self.write(os.path.join("content", relative_path), text)
+        dest_path = os.path.join(self.docs, relative_path.replace(".md", ".html"))
+        return from_path, dest_path
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join(self.docs, "index.html"), self.docs), "/")
+        self.assertEqual(page_url(os.path.join(self.docs, "blog", "tom", "index.html"), self.docs), "/blog/tom/")
+        self.assertEqual(page_url(os.path.join(self.docs, "about.html"), self.docs), "/about.html")
+
+    def test_extract_summary(self):
+        body = "# Title\n\n![image](/a.png)\n\nFirst **bold** paragraph\ncontinues here.\n\nSecond paragraph."
+        self.assertEqual(extract_summary(body), "First bold paragraph continues here.")
+
+    def test_read_page_info(self):
+        from_path, dest_path = self.page("blog/post/index.md", "---\ndate: 2024-01-02\ntags: [Lord of the Rings]\n---\n# Post title\n\nSummary text.")
+        info = read_page_info(from_path, dest_path, self.content, self.docs)
+        self.assertEqual(info.title, "Post title")
+        self.assertEqual(info.date, "2024-01-02")
+        self.assertEqual(info.tags, ["Lord of the Rings"])
+        self.assertEqual(info.url, "/blog/post/")
+        self.assertEqual(info.section, "blog")
+        self.assertEqual(info.summary, "Summary text.")
+        self.assertEqual(tag_slug("Lord of the Rings"), "lord-of-the-rings")
+
+    def test_read_page_info_stops_after_first_paragraph(self):
+        from_path, dest_path = self.page("post.md", "Intro **text**\n\n# Late title\n\nBody\n" + "x\n" * 1000)
+        info = read_page_info(from_path, dest_path, self.content, self.docs)
+        self.assertEqual((info.title, info.summary), ("Late title", "Intro text"))
+        from_path, dest_path = self.page("untitled.md", "Just text\n\n#nospace")
+        with self.assertRaises(Exception):
+            read_page_info(from_path, dest_path, self.content, self.docs)
+
+    def test_generate_site_index(self):
+        pages = [
+            self.page("index.md", "# Home"),
+            self.page("contact/index.md", "# Contact"),
+            self.page("blog/old/index.md", "---\ndate: 2023-01-01\ntags: [tolkien]\n---\n# Old post"),
+            self.page("blog/new/index.md", "---\ndate: 2024-01-01\ntags: [tolkien, news]\n---\n# New post"),
+        ]
+        index, written = generate_site_index(pages, self.content, self.template, self.docs, "/site/", "https://example.com")
+        self.assertEqual(len(index), 4)
+        blog = self.read("docs/blog/index.html")
+        self.assertLess(blog.index("New post"), blog.index("Old post"))
+        self.assertIn("<a href=/site/blog/new/>New post</a>", blog)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "contact", "index.html")))
+        self.assertIn("Old post", self.read("docs/tags/tolkien/index.html"))
+        self.assertNotIn("Old post", self.read("docs/tags/news/index.html"))
+        self.assertIn("<loc>https://example.com/site/contact/</loc>", self.read("docs/sitemap.xml"))
+        feed = self.read("docs/feed.xml")
+        self.assertIn("<title>Home</title>", feed)
+        self.assertIn("<link>https://example.com/site/blog/new/</link>", feed)
+        self.assertIn("<pubDate>Mon, 01 Jan 2024 00:00:00 +0000</pubDate>", feed)
+        self.assertNotIn("Contact", feed)
+
+    def test_no_site_url_skips_feeds(self):
+        pages = [self.page("index.md", "# Home")]
+        generate_site_index(pages, self.content, self.template, self.docs, "/")
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "sitemap.xml")))
+
+
+if __name__ == "__main__":
+    unittest.main()
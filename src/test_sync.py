@@ -0,0 +1,65 @@
+import os
+import unittest
+
+from sync import sync_directory
+from fixtures import TempDirTestCase
+
+
+class TestSync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dst = os.path.join(self.tmp.name, "docs")
+        self.state = os.path.join(self.tmp.name, ".cache", "assets.json")
+
+    def test_copies_only_changed_files(self):
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png")
+        copied, removed = sync_directory(self.src, self.dst, self.state)
+        self.assertEqual(sorted(copied), ["images/a.png", "index.css"])
+        self.assertEqual(self.read(os.path.join(self.dst, "images", "a.png")), "png")
+        copied, removed = sync_directory(self.src, self.dst, self.state)
+        self.assertEqual(copied, [])
+        self.write(os.path.join(self.src, "index.css"), "body { color: red; }")
+        copied, removed = sync_directory(self.src, self.dst, self.state)
+        self.assertEqual(copied, ["index.css"])
+        self.assertEqual(self.read(os.path.join(self.dst, "index.css")), "body { color: red; }")
+
+    def test_removes_stale_assets_but_not_generated_pages(self):
+        self.write(os.path.join(self.src, "old.css"), "old")
+        self.write(os.path.join(self.dst, "index.html"), "<html></html>")
+        sync_directory(self.src, self.dst, self.state)
+        os.remove(os.path.join(self.src, "old.css"))
+        copied, removed = sync_directory(self.src, self.dst, self.state)
+        self.assertEqual(removed, ["old.css"])
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "old.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.dst, "index.html")))
+
+    def test_hardlinks(self):
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        sync_directory(self.src, self.dst, self.state, link=True)
+        self.assertTrue(os.path.samefile(os.path.join(self.src, "index.css"), os.path.join(self.dst, "index.css")))
+        copied, removed = sync_directory(self.src, self.dst, self.state, link=True)
+        self.assertEqual(copied, [])
+
+    def test_transformed_files_stay_current(self):
+        def upper_css(path, data):
+            return data.upper() if path.endswith(".css") else data
+
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "a.png"), "png")
+        for link in (False, True):
+            copied, _ = sync_directory(self.src, self.dst, self.state, link, transform=upper_css)
+            self.assertEqual(self.read(os.path.join(self.dst, "index.css")), "BODY {}")
+            copied, _ = sync_directory(self.src, self.dst, self.state, link, transform=upper_css)
+            self.assertEqual(copied, [])
+        self.write(os.path.join(self.src, "index.css"), "p {}")
+        copied, _ = sync_directory(self.src, self.dst, self.state, transform=upper_css)
+        self.assertEqual(copied, ["index.css"])
+        self.assertEqual(self.read(os.path.join(self.dst, "index.css")), "P {}")
+        copied, _ = sync_directory(self.src, self.dst, self.state)
+        self.assertEqual(self.read(os.path.join(self.dst, "index.css")), "p {}")
+
+
+if __name__ == "__main__":
+    unittest.main()
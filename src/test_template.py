@@ -0,0 +1,40 @@
+import unittest
+
+from template import CompiledTemplate, prefix_basepath
+from common import markdown_to_htmlnode
+
+
+class TestTemplate(unittest.TestCase):
+    def test_slots(self):
+        template = CompiledTemplate("<title>{{ Title }}</title><p>{{Author}}</p>{{ Content }}")
+        self.assertEqual(template.slots, {"Title", "Author", "Content"})
+        self.assertEqual(
+            template.render_to_string({"Title": "Home", "Author": "Tolkien", "Content": "<div></div>"}),
+            "<title>Home</title><p>Tolkien</p><div></div>")
+
+    def test_missing_slot_is_left_in_place(self):
+        template = CompiledTemplate("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(template.render_to_string({"Title": "Home"}), "<title>Home</title>{{ Content }}")
+
+    def test_streaming_slot(self):
+        template = CompiledTemplate("<article>{{ Content }}</article>")
+        node = markdown_to_htmlnode("Some **text**")
+        self.assertEqual(
+            template.render_to_string({"Content": node.write_html}),
+            "<article><div><p>Some <b>text</b></p></div></article>")
+
+    def test_basepath_applied_at_compile_time(self):
+        template = CompiledTemplate('<link href="/index.css" /><a href="https://boot.dev">{{ Title }}</a>', "/site/")
+        self.assertEqual(template.parts[0], '<link href="/site/index.css" /><a href="https://boot.dev">')
+        self.assertEqual(template.render_to_string({"Title": "href=/"}), '<link href="/site/index.css" /><a href="https://boot.dev">href=/</a>')
+
+    def test_basepath_applied_to_nodes(self):
+        node = markdown_to_htmlnode("[home](/) and ![img](/images/a.png) and [out](https://boot.dev)", "/site/")
+        self.assertEqual(
+            node.to_html(),
+            "<div><p><a href=/site/>home</a> and <img src=/site/images/a.png alt=img></img> and <a href=https://boot.dev>out</a></p></div>")
+        self.assertEqual(prefix_basepath("/a", "/"), "/a")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,6 +19,12 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.BOLD, "www.google.com")
         self.assertNotEqual(node, node2)
 
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = True
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+from watch import DependencyGraph, snapshot, diff_snapshots, LIVE_RELOAD_SCRIPT
+
+
+class TestWatch(unittest.TestCase):
+    def test_snapshot_diff(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = os.path.join(tmp, "a.md")
+            second = os.path.join(tmp, "b.md")
+            with open(first, 'w') as f:
+                f.write("# A")
+            old = snapshot([tmp])
+            with open(second, 'w') as f:
+                f.write("# B")
+            with open(first, 'w') as f:
+                f.write("# A changed")
+            new = snapshot([tmp])
+            self.assertEqual(diff_snapshots(old, new), {first, second})
+            os.remove(second)
+            self.assertEqual(diff_snapshots(new, snapshot([tmp])), {second})
+
+    def test_dependency_graph(self):
+        graph = DependencyGraph()
+        graph.add("docs/a.html", ["content/a.md", "template.html"])
+        graph.add("docs/b.html", ["content/b.md", "template.html"])
+        self.assertEqual(graph.affected({"content/a.md"}), {"docs/a.html"})
+        self.assertEqual(graph.affected({"template.html"}), {"docs/a.html", "docs/b.html"})
+        graph.remove("docs/a.html")
+        self.assertEqual(graph.affected({"template.html", "content/a.md"}), {"docs/b.html"})
+
+    def test_live_reload_script(self):
+        self.assertIn("/__livereload", LIVE_RELOAD_SCRIPT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import unittest
+
+from writer import PageWriter, write_if_changed
+from fixtures import TempDirTestCase
+
+
+class TestWriter(TempDirTestCase):
+    def test_write_if_changed(self):
+        dest_path = os.path.join(self.dir, "index.html")
+        self.assertTrue(write_if_changed(dest_path, b"<p>one</p>"))
+        self.assertFalse(write_if_changed(dest_path, b"<p>one</p>"))
+        self.assertTrue(write_if_changed(dest_path, b"<p>two</p>"))
+        with open(dest_path, 'rb') as f:
+            self.assertEqual(f.read(), b"<p>two</p>")
+        self.assertFalse(os.path.exists(f"{dest_path}.tmp"))
+
+    def test_page_writer(self):
+        with PageWriter(threads=3, max_pending=2) as writer:
+            for i in range(20):
+                writer.submit(os.path.join(self.dir, f"page{i % 5}", f"{i}.html"), f"<p>{i}</p>".encode())
+        self.assertEqual(writer.written, 20)
+        with open(os.path.join(self.dir, "page3", "13.html"), 'rb') as f:
+            self.assertEqual(f.read(), b"<p>13</p>")
+        with PageWriter() as writer:
+            writer.submit(os.path.join(self.dir, "page3", "13.html"), b"<p>13</p>")
+        self.assertEqual(writer.skipped, 1)
+
+    def test_page_writer_error(self):
+        blocker = os.path.join(self.dir, "file")
+        with open(blocker, 'w') as f:
+            f.write("not a directory")
+        with self.assertRaises(Exception) as context:
+            with PageWriter() as writer:
+                writer.submit(os.path.join(blocker, "index.html"), b"data")
+        self.assertIn("Failed to write page", str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,10 +5,13 @@ class TextType(Enum):
     BOLD = "**"
     ITALIC = "_"
     CODE = "`"
+    STRIKETHROUGH = "~~"
     LINK = "link"
     IMAGE = "image"
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type=TextType, url=None):
         self.text = text
         self.text_type = text_type
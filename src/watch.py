@@ -0,0 +1,104 @@
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    "<script>(function(){var version=null;setInterval(function(){"
+    f"fetch(\"{LIVE_RELOAD_PATH}\").then(function(r){{return r.text()}}).then(function(v){{"
+    "if(version!==null&&v!==version){location.reload()}version=v}).catch(function(){})},1000)})();</script>"
+)
+
+
+def snapshot(paths):
+    files = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for dir_path, _, file_names in os.walk(path):
+            for file_name in file_names:
+                file_path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                files[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def diff_snapshots(old, new):
+    changed = set()
+    for path, state in new.items():
+        if old.get(path) != state:
+            changed.add(path)
+    for path in old:
+        if path not in new:
+            changed.add(path)
+    return changed
+
+class DependencyGraph():
+    def __init__(self):
+        self.inputs = {}
+        self.outputs = {}
+
+    def __repr__(self):
+        return f"DependencyGraph(Outputs:{len(self.inputs)}, Inputs:{len(self.outputs)})"
+
+    def add(self, output, inputs):
+        self.remove(output)
+        self.inputs[output] = set(inputs)
+        for input_path in inputs:
+            self.outputs.setdefault(input_path, set()).add(output)
+
+    def remove(self, output):
+        for input_path in self.inputs.pop(output, ()):
+            dependents = self.outputs.get(input_path)
+            if dependents is not None:
+                dependents.discard(output)
+                if not dependents:
+                    del self.outputs[input_path]
+
+    def affected(self, changed_inputs):
+        outputs = set()
+        for input_path in changed_inputs:
+            outputs.update(self.outputs.get(input_path, ()))
+        return outputs
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            self.send_body(str(self.server.build_version).encode(), "text/plain")
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+        with open(path, 'r') as f:
+            html = f.read()
+        if "</body>" in html:
+            html = html.replace("</body>", f"{LIVE_RELOAD_SCRIPT}</body>", 1)
+        else:
+            html += LIVE_RELOAD_SCRIPT
+        self.send_body(html.encode(), "text/html; charset=utf-8")
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(directory, port):
+    server = ThreadingHTTPServer(("", port), partial(LiveReloadHandler, directory=directory))
+    server.build_version = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
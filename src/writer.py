@@ -0,0 +1,82 @@
+import os
+import queue
+import threading
+
+
+def write_if_changed(dest_path, data):
+    try:
+        if os.path.getsize(dest_path) == len(data):
+            with open(dest_path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+    tmp_path = f"{dest_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, dest_path)
+    return True
+
+class PageWriter():
+    def __init__(self, threads=4, max_pending=64):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.lock = threading.Lock()
+        self.created_dirs = set()
+        self.errors = []
+        self.written = 0
+        self.skipped = 0
+        self.threads = [threading.Thread(target=self.run, daemon=True) for _ in range(max(1, threads))]
+        for thread in self.threads:
+            thread.start()
+
+    def __repr__(self):
+        return f"PageWriter(Written:{self.written}, Skipped:{self.skipped}, Errors:{len(self.errors)})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(raise_errors=exc_type is None)
+
+    def submit(self, dest_path, data):
+        if self.errors:
+            self.raise_error()
+        self.queue.put((dest_path, data))
+
+    def ensure_dir(self, dest_dir):
+        with self.lock:
+            if dest_dir in self.created_dirs:
+                return
+        os.makedirs(dest_dir, exist_ok=True)
+        with self.lock:
+            self.created_dirs.add(dest_dir)
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            dest_path, data = item
+            try:
+                self.ensure_dir(os.path.dirname(dest_path))
+                changed = write_if_changed(dest_path, data)
+                with self.lock:
+                    if changed:
+                        self.written += 1
+                    else:
+                        self.skipped += 1
+            except Exception as e:
+                with self.lock:
+                    self.errors.append((dest_path, e))
+
+    def close(self, raise_errors=True):
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        if raise_errors and self.errors:
+            self.raise_error()
+
+    def raise_error(self):
+        dest_path, error = self.errors[0]
+        raise Exception(f"Failed to write page {dest_path}: {error}") from error